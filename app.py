@@ -1,13 +1,15 @@
 import streamlit as st
 import pandas as pd
-import requests
 import json
 import time
-import random
-import re
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from scrapers import multi_source_search
+from concurrent.futures import as_completed
+from scrapers import multi_source_search, iter_multi_source_search, LeadMerger, CATEGORIES
+from enrichment import get_enrichment_pipeline
+from metrics import get_metrics
+from journal import get_journal
+from query_planner import get_query_planner
+from site_crawler import harvest_contacts
+from export import FORMATS, available_formats, content_hash, export_bytes
 
 
 # ==========================================
@@ -210,7 +212,7 @@ def discover_companies(pincode):
     """
     Uses the Multi-Source Scraper (Justdial, IndiaMART, Sulekha).
     """
-    categories = ["BPO", "Corporate House", "Hospital", "Manufacturing", "Manpower"]
+    categories = CATEGORIES
     
     with st.spinner(f"🕵️ Searching across Justdial, IndiaMART, and Sulekha for {pincode}..."):
          # Pass API Key for Google Proxy fallback
@@ -222,253 +224,320 @@ def is_small_retail_shop(company):
     # ... existing implementation ...
     return False # Temporarily disabled to ensure we show results if found
 
+# Enrichment helpers live in enrichment.py so they can run outside Streamlit
 
-def get_zauba_directors(company_name, api_key):
+# ==========================================
+# CORE LOGIC
+# ==========================================
+
+LIVE_REFRESH_SECONDS = 0.5  # Min interval between live result table redraws
+
+def finish_metrics(metrics, started):
+    """Closes the run's metrics and keeps the snapshot for the Diagnostics panel."""
+    metrics.observe("phase.total", time.perf_counter() - started)
+    snapshot, path = metrics.finish_run()
+    st.session_state["diagnostics"] = snapshot
+    st.session_state["diagnostics_path"] = path
+
+def render_diagnostics(snapshot):
+    """Per-run latency, credit, cache and error breakdown."""
+    with st.expander("🩺 Diagnostics", expanded=False):
+        serper = snapshot.get("serper", {})
+        cache = snapshot.get("cache", {})
+        counters = snapshot.get("counters", {})
+        calls = sum(row.get("calls", 0) for row in serper.values())
+        queries = sum(row.get("queries", 0) for row in serper.values())
+        
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Serper Credits (est.)", queries, help=f"{calls} HTTP calls")
+        col2.metric("Cache Hit Rate", f"{cache.get('hit_rate', 0):.0%}", help=f"{cache.get('hits', 0)} hits")
+        col3.metric("Page Bytes", f"{counters.get('bytes.pages', 0) / 1024:.0f} KB")
+        col4.metric("Errors Swallowed", sum(n for k, n in counters.items() if k.startswith("exceptions.")))
+        if snapshot.get("overlapping_runs"):
+            st.caption(f"⚠️ {snapshot['overlapping_runs']} other search(es) ran at the same time; counters and Serper usage include their work too.")
+        
+        latency = pd.DataFrame([
+            {"Stage": name, "Count": h["count"], "Avg (s)": h["avg"], "p50 (s)": h["p50"], "p95 (s)": h["p95"], "Max (s)": h["max"]}
+            for name, h in snapshot.get("histograms", {}).items()
+        ])
+        if not latency.empty:
+            st.markdown("**Latency**")
+            st.dataframe(latency.round(3), hide_index=True)
+        
+        if serper:
+            st.markdown("**Serper**")
+            st.dataframe(
+                pd.DataFrame([{"Endpoint": ep, **{k: v for k, v in row.items() if not isinstance(v, dict)}} for ep, row in serper.items()]),
+                hide_index=True
+            )
+        
+        sources = snapshot.get("sources", {})
+        if sources:
+            st.markdown("**Source Strategy**")
+            st.dataframe(pd.DataFrame([{"Source.Method": name, **row} for name, row in sources.items()]), hide_index=True)
+        
+        browser = snapshot.get("browser", {})
+        if browser:
+            st.markdown("**Browser Pool**")
+            st.dataframe(pd.DataFrame([browser]), hide_index=True)
+        
+        queries = snapshot.get("queries", {})
+        if queries:
+            st.markdown("**Query Yield (history)**")
+            st.dataframe(pd.DataFrame([{"Source.Category": name, **row} for name, row in queries.items()]), hide_index=True)
+        
+        exceptions = {k[len("exceptions."):]: n for k, n in counters.items() if k.startswith("exceptions.")}
+        if exceptions:
+            st.markdown("**Exceptions**")
+            st.dataframe(pd.DataFrame(list(exceptions.items()), columns=["Where", "Count"]), hide_index=True)
+        
+        st.download_button(
+            label="📥 Download Metrics (JSON)",
+            data=json.dumps(snapshot, indent=2, default=str),
+            file_name=f"metrics_{snapshot.get('info', {}).get('pincode', 'run')}_{int(snapshot.get('started', 0))}.json",
+            mime="application/json"
+        )
+
+def search_and_process(pincode, resume=True, target_leads=0):
     """
-    Extracts director names directly from Google Snippets.
-    Updated for robust Zauba patterns.
+    1. Scrape Basic Data (Multi-Source, streamed)
+    2. Enrich each lead as soon as it is discovered (Pipelined)
+    Completed work is journaled; with resume=True an interrupted run for this pincode
+    picks up where it stopped instead of repeating finished lookups.
+    With target_leads, searching stops once that many companies were found
+    (highest-yield queries run first).
     """
-    directors = []
-    
-    # Query 1: ZaubaCorp specific
-    url = "https://google.serper.dev/search"
-    payload = json.dumps({
-        "q": f"{company_name} directors site:zaubacorp.com",
-        "gl": "in"
-    })
-    headers = {
-        'X-API-KEY': api_key,
-        'Content-Type': 'application/json'
-    }
+    # Phase 1 + 2 overlap: discovery streams leads straight into enrichment
+    status_box = st.status("🕵️ Phase 1: Scouting Companies...", expanded=True)
+    progress_bar = status_box.progress(0, text="Waiting for first results...")
+    live_table = status_box.empty()
     
+    categories = CATEGORIES
+    pipeline = get_enrichment_pipeline()
+    metrics = get_metrics().start_run(pincode=pincode)
+    started = time.perf_counter()
     try:
-        response = requests.request("POST", url, headers=headers, data=payload)
-        data = response.json()
+        journal = get_journal()
+        if journal.start(pincode, categories, resume):
+            status_box.write("↩️ Resuming the interrupted search for this pincode...")
+        plan = get_query_planner().plan(pincode, categories, target_leads=target_leads)
         
-        if "organic" in data:
-            for item in data["organic"][:3]:
-                snippet = item.get("snippet", "")
-                title = item.get("title", "")
-                text = f"{title} {snippet}"
-                
-                # Pattern A: "Directors of ... are Name1, Name2"
-                if "are" in text and "Directors of" in text:
-                     parts = text.split(" are ")[-1].split(".")[0].split(",")
-                     for p in parts:
-                         clean = p.replace("and", "").strip()
-                         if len(clean) > 3: directors.append(clean)
-                         
-                # Pattern B: Zauba Table "DIN · NAME, Director"
-                # Looks for:  06413133 · PARAG ALLAWADI, Director
-                matches = re.findall(r'·\s([A-Z\s]+),\sDirector', text)
-                if matches:
-                    directors.extend([m.strip() for m in matches])
-                    
-    except:
-        pass
+        merger = LeadMerger()
+        discovered = []
+        pending = {}
+        enriched_results = []
+        last_draw = [0.0]
         
-    # Query 2: Generic "Owner/Director" search if Zauba fails
-    if not directors:
+        def collect(future):
+            try:
+                enriched_results.append(future.result())
+            except Exception as e:
+                # If enrichment fails, just keep basic data
+                enriched_results.append(pending[future])
+            del pending[future]
+        
+        def redraw(force=False):
+            now = time.time()
+            if not force and now - last_draw[0] < LIVE_REFRESH_SECONDS:
+                return
+            last_draw[0] = now
+            total = len(discovered)
+            done = len(enriched_results)
+            progress_bar.progress(done / total if total else 0, text=f"Found {total} companies, researched {done}...")
+            live_table.dataframe(
+                pd.DataFrame(discovered, columns=["Company", "Mobile", "Category", "Source"]),
+                hide_index=True
+            )
+        
+        for company in iter_multi_source_search(pincode, categories, SERPER_API_KEY, journal=journal, plan=plan, merger=merger):
+            if not discovered:
+                metrics.observe("phase.first_lead", time.perf_counter() - started)
+            discovered.append(company)
+            metrics.incr("leads.unique")
+            pending[pipeline.submit(company, SERPER_API_KEY, journal, pincode)] = company
+            for future in [f for f in pending if f.done()]:
+                collect(future)
+            redraw()
+        
+        discovery_done = time.perf_counter()
+        metrics.observe("phase.discovery", discovery_done - started)
+        
+        if not discovered:
+            journal.finish(pincode)
+            status_box.update(label="⚠️ No companies found.", state="error")
+            return []
+        
+        status_box.update(label=f"✅ Found {len(discovered)} companies! Finishing Deep Research...", state="running")
+        
+        for future in as_completed(list(pending)):
+            collect(future)
+            redraw()
+        if merger.retracted:
+            # Leads merged into an earlier one after both were discovered: keep the earlier one
+            enriched_results = [c for c in enriched_results if not merger.is_retracted(c)]
+            discovered = [c for c in discovered if not merger.is_retracted(c)]
+        redraw(force=True)
+        enrichment_done = time.perf_counter()
+        metrics.observe("phase.enrichment", enrichment_done - discovery_done)
+        
+        # Phase 3: visit the websites found, for numbers and emails on their contact pages
+        with_sites = sum(1 for c in enriched_results if c.get("Website") not in (None, "N/A"))
+        status_box.update(label=f"🌐 Checking {with_sites} company websites for contacts...", state="running")
         try:
-            payload = json.dumps({
-                "q": f"{company_name} owner director linkedin",
-                "gl": "in"
-            })
-            response = requests.request("POST", url, headers=headers, data=payload)
-            data = response.json()
-            if "organic" in data:
-                 for item in data["organic"][:2]:
-                     title = item.get("title", "")
-                     # accepted patterns: "Name - Director - Company"
-                     if " - " in title:
-                         parts = title.split(" - ")
-                         for part in parts:
-                             if part.strip() not in [company_name, "Director", "Owner", "Profile", "LinkedIn"] and len(part.split()) < 4:
-                                 if part.strip() not in directors:
-                                     directors.append(part.strip())
-                                     break
-        except:
-             pass
-
-    # Clean duplicates
-    unique_directors = []
-    for d in directors:
-        d_clean = re.sub(r'[^a-zA-Z\s]', '', d).strip()
-        if d_clean and d_clean not in unique_directors and len(d_clean) > 3:
-            unique_directors.append(d_clean)
+            harvest_contacts(enriched_results)
+        except Exception as e:
+            metrics.record_exception("crawl", e)
+        metrics.observe("phase.crawl", time.perf_counter() - enrichment_done)
+        journal.finish(pincode)
             
-    return unique_directors[:3]
+        status_box.update(label="🚀 Mission Complete! All data ready.", state="complete", expanded=False)
+        return enriched_results
+    finally:
+        # A failed or stopped search still closes its run and shows its diagnostics
+        finish_metrics(metrics, started)
 
-def get_startup_india_founders(company_name, api_key):
-    """
-    Search Startup India for Founder details if potential startup.
-    """
-    url = "https://google.serper.dev/search"
-    payload = json.dumps({
-        "q": f"site:startupindia.gov.in {company_name} founder",
-        "gl": "in"
-    })
-    headers = {
-        'X-API-KEY': api_key,
-        'Content-Type': 'application/json'
-    }
-    
-    founders = []
-    try:
-        response = requests.request("POST", url, headers=headers, data=payload)
-        data = response.json()
-        if "organic" in data:
-            for item in data["organic"][:2]:
-                snippet = item.get("snippet", "")
-                # Simple extraction: Look for names after keywords
-                # This is heuristic
-                if "Founder" in snippet or "Director" in snippet:
-                    founders.append(item.get("title").split("-")[0].strip())
-    except:
-        pass
-    return list(set(founders))
+# ==========================================
+# RESULTS VIEW
+# ==========================================
 
-def find_website(company_name, api_key):
-    """Finds website if missing."""
-    url = "https://google.serper.dev/search"
-    payload = json.dumps({
-        "q": f"{company_name} official website",
-        "gl": "in"
-    })
-    headers = {
-        'X-API-KEY': api_key,
-        'Content-Type': 'application/json'
-    }
-    try:
-        response = requests.request("POST", url, headers=headers, data=payload)
-        data = response.json()
-        if "organic" in data and len(data["organic"]) > 0:
-            link = data["organic"][0]["link"]
-            if "justdial" not in link and "indiamart" not in link and "sulekha" not in link:
-                return link
-    except:
-        pass
-    return "N/A"
+RESULTS_PAGE_SIZES = [25, 50, 100, 250]
+RESULTS_COLUMNS = ["Company", "Mobile", "Category", "Employees", "Website", "Directors", "Source"]
 
+# Cached per run: reruns reuse the frame and exports instead of rebuilding them from the leads
+@st.cache_data(show_spinner=False, max_entries=4)
+def results_frame(run_id, _results):
+    """Display table for one run's results; the index is the lead's position in results."""
+    df = pd.DataFrame(_results)
+    for col in RESULTS_COLUMNS:
+        if col not in df:
+            df[col] = None
+    df = df[RESULTS_COLUMNS].copy()
+    df["Directors"] = df["Directors"].apply(lambda x: x if isinstance(x, list) else [])
+    df["Website"] = df["Website"].where(df["Website"] != "N/A", None)
+    df["Employees"] = pd.to_numeric(df["Employees"], errors="coerce")
+    df["Source"] = df["Source"].fillna("Unknown")
+    return df
 
+@st.cache_data(show_spinner=False, max_entries=8)
+def export_download(digest, fmt, _results):
+    """Export file for a result set, built once per (content hash, format)."""
+    return export_bytes(_results, fmt)
 
-# ==========================================
-# CORE LOGIC
-# ==========================================
+@st.cache_data(show_spinner=False, max_entries=4)
+def source_options(run_id, _df):
+    """Individual sources (merged leads carry a comma-joined Source)."""
+    return sorted({s.strip() for value in _df["Source"] for s in value.split(",") if s.strip()})
 
-def get_employee_count(company_name, api_key):
+def filter_results(df, query, categories, sources, with_website, with_directors):
+    mask = pd.Series(True, index=df.index)
+    if query:
+        mask &= df["Company"].str.contains(query, case=False, regex=False, na=False) | \
+            df["Mobile"].astype(str).str.contains(query, regex=False, na=False)
+    if categories:
+        mask &= df["Category"].isin(categories)
+    if sources:
+        mask &= df["Source"].apply(lambda value: any(s in value for s in sources))
+    if with_website:
+        mask &= df["Website"].notna()
+    if with_directors:
+        mask &= df["Directors"].str.len() > 0
+    return df[mask]
+
+@st.fragment
+def render_export(results, pincode, run_id, digest):
     """
-    Searches Google for LinkedIn employee count.
-    Returns: (count, snippet_text, linkedin_url)
+    Format picker and download button; switching format only reruns this fragment.
+    `digest` is the results' content_hash, computed once when the run finished.
     """
-    url = "https://google.serper.dev/search"
-    payload = json.dumps({
-        "q": f"{company_name} linkedin employee count",
-        "gl": "in"
-    })
-    headers = {
-        'X-API-KEY': api_key,
-        'Content-Type': 'application/json'
-    }
+    col1, col2 = st.columns([1, 3])
+    fmt = col1.selectbox("Format", available_formats(), format_func=str.upper, key="export_format", label_visibility="collapsed")
+    mime, ext = FORMATS[fmt]
+    col2.download_button(
+        label=f"📥 Download Full Report ({len(results)} Companies)",
+        data=export_download(digest, fmt, results),
+        file_name=f'Master_Leads_{pincode}_{int(run_id)}{ext}',
+        mime=mime,
+        type="primary"
+    )
 
-    try:
-        response = requests.request("POST", url, headers=headers, data=payload)
-        data = response.json()
+def render_company_detail(company):
+    """Card for one lead, rendered only when it is selected in the table."""
+    with st.container():
+        st.subheader(company['Company'])
+        st.caption(f"Source: {company.get('Source', 'Unknown')}")
         
-        organic = data.get("organic", [])
-        if not organic:
-            return None, "", None
+        # Details Grid
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.markdown(f"**📱 Mobile:** `{company.get('Mobile')}`")
+            if company.get('Alt_Mobiles'):
+                st.markdown(f"**📞 Other Numbers:** {', '.join(company['Alt_Mobiles'])}")
+            if company.get('Emails'):
+                st.markdown(f"**✉️ Email:** {', '.join(company['Emails'])}")
+            st.markdown(f"**🏷️ Category:** {company.get('Category')}")
+            st.markdown(f"**👥 Employees:** {company.get('Employees', 'N/A')}")
             
-        result = organic[0]
-        snippet = result.get("snippet", "")
-        title = result.get("title", "")
-        link = result.get("link", "")
-        full_text = snippet + " " + title
-        
-        # Extract employee count
-        emp_count = None
-        match = re.search(r"([\d,]+)(?:\+|-\d+)?\s+employees", full_text, re.IGNORECASE)
-        if match:
-            count_str = match.group(1).replace(',', '')
-            try:
-                emp_count = int(count_str)
-            except ValueError:
-                emp_count = None
-        
-        return emp_count, snippet, link
-        
-    except Exception as e:
-        return None, "", None
-
-def enrich_single_company(company):
-    """
-    Performs deep research on a single company:
-    1. Find Website
-    2. Find Directors (Zauba)
-    3. Find Founders (Startup India)
-    3. Find Founders (Startup India)
-    """
-    # 1. Find Website
-    company["Website"] = find_website(company['Company'], SERPER_API_KEY)
-    
-    # 2. Get Directors (ZaubaCorp)
-    directors = get_zauba_directors(company['Company'], SERPER_API_KEY)
-    
-    # 3. Get Founders (Startup India) - if needed
-    if not directors:
-        founders = get_startup_india_founders(company['Company'], SERPER_API_KEY)
-        if founders:
-             directors.extend(founders)
-             company["Startup"] = True
-    
-    company["Directors"] = directors
-
-    # 4. Get Employee Count (LinkedIn)
-    emp_count, _, _ = get_employee_count(company['Company'], SERPER_API_KEY)
-    company["Employees"] = emp_count if emp_count else "N/A"
-    
-    return company
+        with col2:
+            website = company.get('Website')
+            if website and website != "N/A":
+                st.markdown(f"**🌐 Website:** [Link]({website})")
+            else:
+                st.markdown("**🌐 Website:** N/A")
+                
+        with col3:
+            directors = company.get('Directors', [])
+            if directors:
+                st.markdown("**🕴️ Directors/Founders:**")
+                for d in directors:
+                    st.text(f"• {d}")
+            else:
+                st.markdown("**🕴️ Directors:** Not Found")
 
-def search_and_process(pincode):
+@st.fragment
+def render_results(run_id, results):
     """
-    1. Scrape Basic Data (Multi-Source)
-    2. Enrich ALL Data (Parallel)
+    Filterable, paginated lead table. Runs as a fragment, so filtering, paging and
+    selecting a row only rerun this view; only the current page is sent to the browser.
     """
-    # Phase 1: Discovery
-    status_box = st.status("🕵️ Phase 1: Scouting Companies...", expanded=True)
-    
-    categories = ["BPO", "Corporate House", "Hospital", "Manufacturing", "Manpower"]
-    raw_leads = multi_source_search(pincode, categories, SERPER_API_KEY)
-    
-    if not raw_leads:
-        status_box.update(label="⚠️ No companies found.", state="error")
-        return []
-        
-    status_box.update(label=f"✅ Found {len(raw_leads)} companies! Starting Deep Research...", state="running")
-    
-    # Phase 2: Deep Enrichment
-    enriched_results = []
-    total = len(raw_leads)
-    progress_bar = status_box.progress(0, text="Extracting Directors & Websites...")
-    
-    # Parallel Enrichment
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {executor.submit(enrich_single_company, company): company for company in raw_leads}
-        
-        completed_count = 0
-        for future in as_completed(futures):
-            try:
-                result = future.result()
-                enriched_results.append(result)
-            except Exception as e:
-                # If enrichment fails, just keep basic data
-                enriched_results.append(futures[future])
-                
-            completed_count += 1
-            progress_bar.progress(completed_count / total, text=f"Researched {completed_count}/{total} companies...")
-            
-    status_box.update(label="🚀 Mission Complete! All data ready.", state="complete", expanded=False)
-    return enriched_results
+    df = results_frame(run_id, results)
+    
+    col1, col2, col3 = st.columns([2, 1, 1])
+    query = col1.text_input("Search", placeholder="Company name or mobile", key="results_query")
+    categories = col2.multiselect("Category", sorted(df["Category"].dropna().unique()), key="results_categories")
+    sources = col3.multiselect("Source", source_options(run_id, df), key="results_sources")
+    col1, col2, col3, col4 = st.columns(4)
+    with_website = col1.checkbox("Has website", key="results_with_website")
+    with_directors = col2.checkbox("Has directors", key="results_with_directors")
+    page_size = col4.selectbox("Rows per page", RESULTS_PAGE_SIZES, key="results_page_size")
+    
+    filtered = filter_results(df, query, categories, sources, with_website, with_directors)
+    pages = max(1, -(-len(filtered) // page_size))
+    if st.session_state.setdefault("results_page", 1) > pages:
+        st.session_state["results_page"] = pages  # Filters shrank the result set
+    page = col3.number_input("Page", min_value=1, max_value=pages, key="results_page")
+    page_rows = filtered.iloc[(page - 1) * page_size:page * page_size]
+    st.caption(f"Page {page} of {pages}: showing {len(page_rows)} of {len(filtered)} matching leads ({len(df)} total). Select a row for details.")
+    
+    event = st.dataframe(
+        page_rows,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key="results_table",
+        column_config={
+            "Company": st.column_config.TextColumn("Company", width="large"),
+            "Mobile": st.column_config.TextColumn("Mobile"),
+            "Employees": st.column_config.NumberColumn("Employees", format="%d"),
+            "Website": st.column_config.LinkColumn("Website", display_text="Open"),
+            "Directors": st.column_config.ListColumn("Directors"),
+            "Source": st.column_config.TextColumn("Source", width="medium"),
+        }
+    )
+    
+    selected = event.selection.rows
+    if selected and selected[0] < len(page_rows):
+        st.divider()
+        render_company_detail(results[page_rows.index[selected[0]]])
 
 # ==========================================
 # STREAMLIT UI
@@ -487,6 +556,20 @@ with st.sidebar:
             help="Enter the pincode to search and enrich companies"
         )
         
+        resume = st.checkbox(
+            "Resume interrupted search",
+            value=True,
+            help="Reuse lookups already completed by an unfinished search for this pincode"
+        )
+        
+        target_leads = st.number_input(
+            "Target companies (0 = no limit)",
+            min_value=0,
+            value=0,
+            step=10,
+            help="Stop searching once this many companies were found; the best-yielding sources are searched first"
+        )
+        
         st.markdown("")
         submit_button = st.form_submit_button("🚀 Start Master Search", type="primary")
 
@@ -497,10 +580,13 @@ with st.sidebar:
             # Clear previous state
             if "results" in st.session_state:
                 del st.session_state["results"]
+            st.session_state.pop("diagnostics", None)
                 
-            data = search_and_process(pincode)
+            data = search_and_process(pincode, resume, target_leads)
             st.session_state["results"] = data
             st.session_state["pincode"] = pincode
+            st.session_state["run_id"] = time.time()
+            st.session_state["results_digest"] = content_hash(data)
             # st.rerun() # No need to rerun, just continue render
 
     st.markdown("")
@@ -508,7 +594,7 @@ with st.sidebar:
     st.markdown("### ℹ️ How it Works")
     st.markdown("""
     1. **Scrape**: Jussdial, IndiaMART, Sulekha, Google Maps.
-    2. **Enrich**: Automatically finds **Directors** & **Websites** for EVERY company.
+    2. **Enrich**: Automatically finds **Directors** & **Websites** for EVERY company, then checks each website's contact pages for more numbers and emails.
     3. **Deliver**: One single list with all details.
     """)
 
@@ -523,60 +609,18 @@ else:
     # Results Display
     results = st.session_state["results"]
     pincode = st.session_state.get("pincode", "")
+    run_id = st.session_state.get("run_id", 0)
+    
+    if "diagnostics" in st.session_state:
+        render_diagnostics(st.session_state["diagnostics"])
     
     if not results:
         st.warning(f"No results found for {pincode}.")
     else:
         st.markdown(f"### Master Lead List: {pincode} ({len(results)} Leads)")
         
-        # CSV Export Logic
-        df_export = pd.DataFrame(results)
-        # Flatten lists for CSV
-        df_export["Directors"] = df_export["Directors"].apply(lambda x: ", ".join(x) if isinstance(x, list) else x)
-        
-        csv = df_export.to_csv(index=False).encode('utf-8')
-        
-        st.download_button(
-            label=f"📥 Download Full Report ({len(results)} Companies)",
-            data=csv,
-            file_name=f'Master_Leads_{pincode}_{int(time.time())}.csv',
-            mime='text/csv',
-            type="primary"
-        )
+        render_export(results, pincode, run_id, st.session_state["results_digest"])
         
         st.divider()
         
-        # Detailed List View
-        for company in results:
-            with st.container():
-                # Card Layout
-                # Card Layout
-                st.subheader(company['Company'])
-                st.caption(f"Source: {company.get('Source', 'Unknown')}")
-                
-                # Details Grid
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.markdown(f"**📱 Mobile:** `{company.get('Mobile')}`")
-                    st.markdown(f"**🏷️ Category:** {company.get('Category')}")
-                    st.markdown(f"**👥 Employees:** {company.get('Employees', 'N/A')}")
-                    
-                with col2:
-                    website = company.get('Website')
-                    if website and website != "N/A":
-                        st.markdown(f"**🌐 Website:** [Link]({website})")
-                    else:
-                        st.markdown("**🌐 Website:** N/A")
-                        
-                with col3:
-                    directors = company.get('Directors', [])
-                    if directors:
-                        st.markdown("**🕴️ Directors/Founders:**")
-                        for d in directors:
-                            st.text(f"• {d}")
-                    else:
-                        st.markdown("**🕴️ Directors:** Not Found")
-                
-                st.divider()
-
-
+        render_results(run_id, results)
@@ -0,0 +1,182 @@
+"""
+Generates the synthetic corpus in benchmarks/fixtures used by run_benchmarks.py.
+
+The pages are not saved from the live sites: they are built from templates that mimic
+the markup of Justdial, IndiaMART and Sulekha listing pages (card structure, phone
+formats including rejected landlines, nav/footer/script/style bulk, deep framework
+nesting) and the shape of Serper search/places responses. Names, phones and snippets
+are random but seeded, so rerunning this reproduces the checked-in files byte for byte.
+
+The benchmarks therefore measure throughput, memory and parser parity/regressions on
+realistic page sizes and layouts; their yield numbers say nothing about recall on real
+pages, whose markup drifts.
+
+    python benchmarks/make_fixtures.py
+    python benchmarks/make_fixtures.py --out /tmp/fixtures
+"""
+import argparse
+import json
+import os
+import random
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+SEED = 20261018
+
+FIRST = ["Shree", "Sai", "Ganesh", "Apex", "Galaxy", "Sunrise", "Metro", "Royal", "Global", "Prime", "Unique", "Perfect",
+         "Classic", "Star", "Vision", "Bharat", "Capital", "Pioneer", "Elite", "Swastik", "Om", "Krishna", "Balaji", "Laxmi", "Zenith"]
+SECOND = ["Enterprises", "Solutions", "Services", "Infotech", "Healthcare", "Hospital", "Manpower Consultants", "Industries",
+          "Builders", "Traders", "BPO Services", "Corporate Services", "Staffing", "Technologies", "Associates", "Medicare",
+          "Engineering Works", "Placement Agency"]
+AREAS = ["Saket", "Malviya Nagar", "Hauz Khas", "Sheikh Sarai", "Chirag Delhi", "Press Enclave", "Pushp Vihar",
+         "Khirki Extension", "Shivalik", "Panchsheel Park"]
+
+r = random.Random(SEED)
+
+def name():
+    return f"{r.choice(FIRST)} {r.choice(SECOND)}" + r.choice(["", " Pvt Ltd", " Private Limited", " LLP", ""])
+
+def mobile():
+    return f"{r.choice('6789')}{r.randint(100000000, 999999999)}"
+
+def phone_fmt(m):
+    """A mobile in one of the formats seen on listings (or a Delhi landline, which is rejected)."""
+    k = r.random()
+    if k < 0.3: return f"+91 {m[:5]} {m[5:]}"
+    if k < 0.5: return f"0{m}"
+    if k < 0.6: return f"011-{r.randint(20000000, 49999999)}"
+    if k < 0.7: return f"{m[:5]}-{m[5:]}"
+    return m
+
+def script(n):
+    return "<script>window.__data=" + json.dumps({"k": [r.random() for _ in range(n)]}) + ";</script>"
+
+def style(n):
+    return "<style>" + "".join(f".c{i}{{margin:{i}px;color:#{r.randint(0,0xffffff):06x}}}" for i in range(n)) + "</style>"
+
+def nav():
+    return "<header><nav><ul>" + "".join(f"<li><a href='/c/{i}'>Category link {i}</a></li>" for i in range(40)) + "</ul></nav><div class='searchbar'><input placeholder='Search for businesses'/><button>Search</button></div></header>"
+
+def footer():
+    return "<footer><div class='links'>" + "".join(f"<div class='col'><h4>Section {i}</h4><ul>" + "".join(f"<li><a href='#'>Footer link {i}.{j}</a></li>" for j in range(12)) + "</ul></div>" for i in range(6)) + "</div><p>Copyright 2008-2026. All rights reserved.</p></footer>"
+
+def justdial(n):
+    cards = []
+    for i in range(n):
+        m = mobile()
+        nm = name()
+        reviews = "".join(f"<div class='review'><div class='rv-user'><span>User {j}</span></div><p>Good service, visited on {r.randint(1,28)}/0{r.randint(1,9)}/2025.</p></div>" for j in range(r.randint(0, 4)))
+        cards.append(f"""<li class="cntanr" data-href="/Delhi/{nm.replace(' ','-')}"><div class="store-details"><div class="col-md-12 col-xs-12 colsp"><div class="row"><div class="col-sm-9"><div class="resultbox_title_anchor"><h2 class="store-name"><span class="lng_cont_name">{nm}</span></h2></div><div class="rating"><span class="green-box">{r.randint(30,50)/10}</span><span class="rt_count">{r.randint(1,900)} Ratings</span></div><p class="contact-info"><span class="mobilesv">{phone_fmt(m)}</span></p><p class="address-info tme_adrssec"><span class="cont_fl_addr">{r.randint(1,300)}, {r.choice(AREAS)}, New Delhi - 110017</span></p><div class="callbutton" role="button">Show Number</div>{reviews}</div></div></div></div></li>""")
+    return f"<!DOCTYPE html><html><head><title>Top BPO in 110017 - Justdial</title>{style(400)}{script(3000)}</head><body>{nav()}<div id='tab-5'><div class='jsx-wrap'><div><div><ul class='resultlist'>{''.join(cards)}</ul></div></div></div></div>{script(2000)}{footer()}</body></html>"
+
+def indiamart(n):
+    cards = []
+    for i in range(n):
+        m = mobile(); nm = name()
+        prods = "".join(f"<li class='prd'><span>Product {j} for {nm.split()[0]}</span><span class='price'>Rs {r.randint(100,99999)}</span></li>" for j in range(r.randint(1, 5)))
+        cards.append(f"""<div class="card brs5"><div class="cardbody"><div class="r-cl b-gry"><div class="companyname"><a class="cardlinks" href="https://www.indiamart.com/{nm.lower().replace(' ','-')}/">{nm}</a></div><div class="newLocationUi"><span class="elps elps1">{r.choice(AREAS)}, Delhi</span></div><ul class="prdlist">{prods}</ul><div class="cntctbtn"><span class="pns_h duet">{phone_fmt(m)}</span><span>Call Now</span></div><div class="gst">GST: 07{r.randint(10**10, 10**11-1)}Z{r.randint(1,9)}</div></div></div></div>""")
+    return f"<html><head><title>{n} BPO Service Providers in Delhi</title>{style(200)}{script(1500)}</head><body>{nav()}<section class='listing'><div class='wrp'><div class='lst'>{''.join(cards)}</div></div></section>{footer()}</body></html>"
+
+def sulekha(n):
+    cards = []
+    for i in range(n):
+        m = mobile(); nm = name()
+        cards.append(f"""<article class="sk-card"><div class="business-info"><div class="hd"><h3><a href="/{nm.lower().replace(' ','-')}">{nm}</a></h3><div class="rating"><b>{r.randint(30,50)/10}</b> ({r.randint(1,300)} reviews)</div></div><div class="loc">{r.choice(AREAS)}, Delhi</div><div class="yrs">{r.randint(1,30)} Years in Business</div><div class="contact"><span>Call</span> {phone_fmt(m)}</div><div class="tags">{''.join(f'<span>tag{j}</span>' for j in range(r.randint(0,6)))}</div></div></article>""")
+    return f"<html><head><title>Manpower Consultants near 110017 | Sulekha</title>{style(150)}{script(800)}</head><body>{nav()}<main><div class='results'>{''.join(cards)}</div></main>{footer()}</body></html>"
+
+def deep(n, depth=25):
+    """Framework-style dump: every card wrapped in many anonymous divs."""
+    cards = []
+    for i in range(n):
+        m = mobile(); nm = name()
+        inner = f"<div class='c'><h3>{nm}</h3><div>{r.choice(AREAS)}, New Delhi</div><div><span>Mobile:</span> {phone_fmt(m)}</div></div>"
+        for _ in range(r.randint(depth // 2, depth)):
+            inner = f"<div>{inner}</div>"
+        cards.append(inner)
+    body = "".join(cards)
+    for _ in range(depth):
+        body = f"<div class='layer'>{body}</div>"
+    return f"<html><head><title>Hospitals in 110017</title>{script(1000)}</head><body>{nav()}{body}{footer()}</body></html>"
+
+def organic_proxy(domain, n):
+    items = []
+    for i in range(n):
+        nm = name(); m = mobile()
+        k = r.random()
+        snippet = f"{nm} in {r.choice(AREAS)}, Delhi. Call {phone_fmt(m)} for BPO services." if k < 0.6 else f"Find the best {r.choice(SECOND)} near you. Read reviews and get contact details."
+        items.append({"title": f"{nm} - {domain.split('.')[0].title()}", "link": f"https://www.{domain}/{nm.lower().replace(' ','-')}", "snippet": snippet, "position": i + 1})
+    return {"searchParameters": {"q": f"site:{domain} BPO 110017", "gl": "in", "num": 100}, "organic": items}
+
+def places(n):
+    out = []
+    for i in range(n):
+        m = mobile()
+        p = {"position": i + 1, "title": name(), "address": f"{r.randint(1,300)}, {r.choice(AREAS)}, New Delhi 110017", "rating": r.randint(30,50)/10, "category": r.choice(SECOND)}
+        if r.random() < 0.85: p["phoneNumber"] = phone_fmt(m)
+        if r.random() < 0.5: p["website"] = f"https://{p['title'].split()[0].lower()}{i}.in/"
+        out.append(p)
+    return {"searchParameters": {"q": "BPO in 110017", "type": "places"}, "places": out}
+
+def zauba(n):
+    out = []
+    for i in range(n):
+        nm = name().upper()
+        d1, d2 = "RAJESH KUMAR SHARMA", f"{r.choice(['AMIT','NEHA','SUNIL','POOJA'])} {r.choice(['GUPTA','VERMA','SINGH','JAIN'])}"
+        k = r.random()
+        if k < 0.4:
+            items = [{"title": f"{nm} - Company, directors and contact details | Zauba Corp", "snippet": f"Directors of {nm} are {d1.title()}, {d2.title()} and Ravi Mehta. {nm} is a private company."}]
+        elif k < 0.8:
+            items = [{"title": f"{nm} - Zauba Corp", "snippet": f"0{r.randint(1000000,9999999)} · {d1}, Director · 0{r.randint(1000000,9999999)} · {d2}, Director"}]
+        else:
+            items = []
+        items += [{"title": f"{nm} | Company Info", "snippet": "Registered office address and incorporation details."}]
+        out.append({"organic": items})
+    return out
+
+def linkedin_directors(n):
+    return [{"organic": [{"title": f"{r.choice(['Amit Gupta','Neha Verma','Rohit Jain'])} - Director - {name()} | LinkedIn", "snippet": "Experience: Director"}, {"title": "Owner - Profile - LinkedIn", "snippet": ""}]} for _ in range(n)]
+
+def employee_count(n):
+    out = []
+    for i in range(n):
+        k = r.random()
+        if k < 0.4: sn = f"{name()} | {r.randint(11,5000):,} followers on LinkedIn. Company size: {r.choice(['11-50','51-200','201-500'])} employees"
+        elif k < 0.8: sn = f"See who you know at {name()}. {r.randint(2,9999):,} employees. Industry: Outsourcing."
+        else: sn = "Join LinkedIn today."
+        out.append({"organic": [{"title": f"{name()} | LinkedIn", "snippet": sn, "link": f"https://in.linkedin.com/company/x{i}"}]})
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the synthetic benchmark fixtures")
+    parser.add_argument("--out", default=FIXTURES_DIR, help="output directory (default: benchmarks/fixtures)")
+    args = parser.parse_args()
+    os.makedirs(args.out, exist_ok=True)
+    r.seed(SEED)
+
+    # Generation order is part of the output: every fixture draws from the same seeded RNG
+    pages = {
+        "justdial_bpo_110017.html": justdial(120),
+        "indiamart_bpo_delhi.html": indiamart(90),
+        "sulekha_manpower_110017.html": sulekha(80),
+        "deep_nested_hospital_110017.html": deep(150),
+    }
+    for fn, html in pages.items():
+        with open(os.path.join(args.out, fn), "w") as f:
+            f.write(html)
+        print(fn, len(html))
+
+    json_fixtures = {
+        "serper_search_justdial.json": organic_proxy("justdial.com", 100),
+        "serper_search_indiamart.json": organic_proxy("indiamart.com", 100),
+        "serper_places.json": places(20),
+        "serper_zauba_directors.json": zauba(50),
+        "serper_linkedin_directors.json": linkedin_directors(50),
+        "serper_employee_count.json": employee_count(50),
+    }
+    for fn, data in json_fixtures.items():
+        with open(os.path.join(args.out, fn), "w") as f:
+            json.dump(data, f, indent=1)
+        print(fn, os.path.getsize(os.path.join(args.out, fn)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Offline extraction benchmarks over a synthetic fixture corpus.
+
+Runs the parsers against benchmarks/fixtures without touching the network. The fixtures
+are generated by benchmarks/make_fixtures.py: templated pages mimicking Justdial /
+IndiaMART / Sulekha listings and Serper-shaped JSON responses, not pages saved from the
+live sites. Yields guard against parser regressions and lxml/BeautifulSoup drift; they
+are not a measure of recall on real pages. Reports for each case:
+- throughput (pages or responses per second, and leads/items per second)
+- peak memory of one run (tracemalloc)
+- extraction yield (leads/items found per run)
+plus the memory held per lead, as plain dicts vs leads.Lead records.
+
+Results are compared with benchmarks/baseline.json: a yield change or a throughput drop
+beyond --tolerance is reported as a regression (exit code 1).
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --only html --repeat 10
+    python benchmarks/run_benchmarks.py --update-baseline
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import scrapers
+import enrichment
+from leads import Lead
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+# Fixture -> (source name, category) for the HTML cases
+HTML_FIXTURES = {
+    "justdial_bpo_110017.html": ("Justdial", "BPO"),
+    "indiamart_bpo_delhi.html": ("IndiaMART", "BPO"),
+    "sulekha_manpower_110017.html": ("Sulekha", "Manpower"),
+    "deep_nested_hospital_110017.html": ("Justdial", "Hospital"),
+}
+PROXY_FIXTURES = {
+    "serper_search_justdial.json": "justdial.com",
+    "serper_search_indiamart.json": "indiamart.com",
+}
+PHONE_BATCH = 100000  # Phone strings per normalization run
+LEAD_COUNT = 100000   # Leads per memory measurement
+
+def _read(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+def _load(name):
+    return json.loads(_read(name))
+
+def build_cases():
+    """Returns {case_name: (fn, units_per_run)}; fn() returns the extracted items."""
+    cases = {}
+
+    for fixture, (source, category) in HTML_FIXTURES.items():
+        html = _read(fixture)
+        cases[f"html:{fixture}"] = (lambda h=html, s=source, c=category: scrapers.extract_from_html_fuzzy(h, s, c), 1)
+
+    for fixture, domain in PROXY_FIXTURES.items():
+        data = _load(fixture)
+        cases[f"serper:{fixture}"] = (lambda d=data, dom=domain: scrapers._parse_proxy_results(d, "BPO", dom), 1)
+
+    places = _load("serper_places.json")["places"]
+    cases["serper:serper_places.json"] = (lambda: scrapers._parse_places(places, "BPO"), 1)
+
+    zauba = _load("serper_zauba_directors.json")
+    cases["enrich:zauba_directors"] = (
+        lambda: [d for data in zauba for d in enrichment.clean_director_names(enrichment.parse_zauba_directors(data))],
+        len(zauba)
+    )
+    linkedin = _load("serper_linkedin_directors.json")
+    cases["enrich:linkedin_directors"] = (
+        lambda: [d for data in linkedin for d in enrichment.parse_linkedin_directors(data, "Company")],
+        len(linkedin)
+    )
+    employees = _load("serper_employee_count.json")
+    cases["enrich:employee_count"] = (
+        lambda: [c for c in (enrichment.parse_employee_count(data)[0] for data in employees) if c],
+        len(employees)
+    )
+
+    # Phone validation over every phone-like string in the corpus, repeated to PHONE_BATCH
+    corpus = []
+    for fixture in HTML_FIXTURES:
+        corpus.extend(scrapers.find_phone_candidates(_read(fixture)))
+    for fixture in PROXY_FIXTURES:
+        corpus.extend(p for item in _load(fixture)["organic"] for p in scrapers.find_phone_candidates(item["snippet"]))
+    corpus.extend(p["phoneNumber"] for p in places if p.get("phoneNumber"))
+    phones = (corpus * (PHONE_BATCH // len(corpus) + 1))[:PHONE_BATCH]
+    cases["phones:normalize_mobiles"] = (lambda: [p for p in scrapers.normalize_mobiles(phones) if p], len(phones))
+    cases["phones:is_valid_mobile_string"] = (lambda: [p for p in map(scrapers.is_valid_mobile_string, phones) if p], len(phones))
+
+    return cases
+
+def _enriched_leads(make, count):
+    """`count` distinct leads shaped like a sweep's output: enriched, a third merged from two sources."""
+    leads = []
+    for i in range(count):
+        mobile = f"9{i:09d}"
+        lead = make({
+            "Company": f"Acme Traders {i}", "Category": scrapers.CATEGORIES[i % len(scrapers.CATEGORIES)],
+            "Mobile": mobile, "Source": "Google Maps", "Raw_Phone": mobile,
+            "Website": f"https://acme{i}.in" if i % 2 else "N/A",
+        })
+        lead["Directors"] = []
+        lead["Employees"] = "N/A"
+        if i % 3 == 0:
+            lead["Source"] = ", ".join(["Justdial", "Google Maps"])
+        leads.append(lead)
+    return leads
+
+def lead_memory(count=LEAD_COUNT):
+    """Bytes held per lead (field values included) as plain dicts and as Lead records."""
+    out = {}
+    for name, make in (("dict", dict), ("Lead", Lead)):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        leads = _enriched_leads(make, count)
+        out[name] = (tracemalloc.get_traced_memory()[0] - before) / len(leads)
+        tracemalloc.stop()
+        del leads
+    return out
+
+def check_parity():
+    """The lxml extractor must return the same records as the BeautifulSoup reference."""
+    failures = []
+    for fixture, (source, category) in HTML_FIXTURES.items():
+        html = _read(fixture)
+        if scrapers.extract_from_html_fuzzy(html, source, category) != scrapers.extract_from_html_fuzzy_soup(html, source, category):
+            failures.append(fixture)
+    return failures
+
+def run_case(fn, units, repeat):
+    items = fn()  # Warm-up and yield
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": elapsed,
+        "throughput": units / elapsed if elapsed else float("inf"),
+        "items_per_s": len(items) / elapsed if elapsed else float("inf"),
+        "peak_kb": peak / 1024,
+        "yield": len(items),
+    }
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if r["yield"] != base["yield"]:
+            regressions.append(f"{name}: yield {base['yield']} -> {r['yield']}")
+        if r["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput']:.1f} -> {r['throughput']:.1f}/s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline extraction benchmarks")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--only", default="", help="run cases whose name contains this text")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed throughput drop vs baseline (0.3 = 30%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="write results to baseline.json")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    cases = {name: case for name, case in build_cases().items() if args.only in name}
+    results = {name: run_case(fn, units, args.repeat) for name, (fn, units) in cases.items()}
+
+    memory = lead_memory() if "leads" in args.only or not args.only else None
+
+    if args.json:
+        print(json.dumps({**results, "lead_memory": memory} if memory else results, indent=2))
+    else:
+        print(f"{'case':<40} {'units/s':>10} {'items/s':>12} {'peak KB':>10} {'yield':>7}")
+        for name, r in results.items():
+            print(f"{name:<40} {r['throughput']:>10.1f} {r['items_per_s']:>12.1f} {r['peak_kb']:>10.0f} {r['yield']:>7}")
+        if memory:
+            print(f"Memory per lead ({LEAD_COUNT} enriched leads): dict {memory['dict']:.0f} B, "
+                  f"Lead {memory['Lead']:.0f} B ({memory['Lead'] / memory['dict'] - 1:+.0%})")
+
+    failed = False
+    parity = check_parity() if "html" in args.only or not args.only else []
+    if parity:
+        failed = True
+        print("Parity mismatch vs extract_from_html_fuzzy_soup: " + ", ".join(parity))
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as f:
+                baseline = json.load(f)
+        for name, r in results.items():
+            baseline[name] = {"throughput": round(r["throughput"], 1), "yield": r["yield"]}
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+    elif os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        failed = failed or bool(regressions)
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import asyncio
+import atexit
+import os
+import threading
+from playwright.async_api import async_playwright
+
+# Pool Limits
+MAX_CONTEXTS = 4              # Pages allowed in flight at once (raised to the async engine's concurrency)
+MAX_PAGES_PER_CONTEXT = 25    # Recycle a context after this many page loads
+MAX_PAGES_PER_BROWSER = 300   # Relaunch Chromium after this many page loads
+
+class _BrowserHandle:
+    """A launched Chromium process plus lease bookkeeping."""
+    def __init__(self, browser):
+        self.browser = browser
+        self.pages = 0
+        self.leases = 0
+        self.retired = False
+
+class _ContextHandle:
+    """A reusable browser context owned by one _BrowserHandle."""
+    def __init__(self, owner, context):
+        self.owner = owner
+        self.context = context
+        self.pages = 0
+
+class BrowserPool:
+    """
+    One long-lived headless Chromium shared by every Playwright-backed scraper.
+    - The browser runs on a private event loop thread, so any scraper thread can call fetch().
+    - At most `max_contexts` pages are open at once; contexts are reused between fetches.
+      ensure_contexts() raises the limit to a caller's concurrency unless it is `pinned`.
+    - Contexts are recycled after `max_pages_per_context` loads or when a page crashes.
+    - The browser is relaunched after `max_pages_per_browser` loads or if it disconnects.
+    """
+    def __init__(self, user_agent=None, headless=True, max_contexts=MAX_CONTEXTS,
+                 max_pages_per_context=MAX_PAGES_PER_CONTEXT, max_pages_per_browser=MAX_PAGES_PER_BROWSER,
+                 pinned=False):
+        self.user_agent = user_agent
+        self.headless = headless
+        self.max_contexts = max_contexts
+        self.pinned = pinned
+        self.max_pages_per_context = max_pages_per_context
+        self.max_pages_per_browser = max_pages_per_browser
+
+        self._loop = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+        # Loop-side state (only touched from the pool thread)
+        self._playwright = None
+        self._current = None
+        self._idle = []
+        self._slots = None        # asyncio.Condition guarding _in_use
+        self._in_use = 0
+        self._launches = 0
+        self._launch_lock = None
+
+    # ---------- Thread / Loop Management ----------
+
+    def _get_loop(self):
+        with self._thread_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def submit(self, coro):
+        """Schedule a coroutine on the pool loop. Returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+
+    def fetch(self, url, action, timeout=None):
+        """
+        Runs `await action(page, url)` on a pooled page and returns its result.
+        Blocking; safe to call from any thread.
+        """
+        return self.submit(self._run(url, action)).result(timeout)
+
+    async def fetch_async(self, url, action):
+        """Awaitable variant of fetch() usable from any other event loop."""
+        return await asyncio.wrap_future(self.submit(self._run(url, action)))
+
+    def ensure_contexts(self, n):
+        """Raises the page limit to `n` (never lowers it; no-op when pinned)."""
+        if self.pinned or n <= self.max_contexts:
+            return
+        self.max_contexts = n
+        with self._thread_lock:
+            loop = self._loop
+        if loop is not None:
+            # Wake fetches waiting for a slot
+            asyncio.run_coroutine_threadsafe(self._notify_slots(), loop)
+
+    async def _notify_slots(self):
+        if self._slots is not None:
+            async with self._slots:
+                self._slots.notify_all()
+
+    def stats(self):
+        return {
+            "max_contexts": self.max_contexts,
+            "pinned": self.pinned,
+            "in_use": self._in_use,
+            "idle_contexts": len(self._idle),
+            "browser_launches": self._launches,
+            "browser_pages": self._current.pages if self._current else 0,
+        }
+
+    # ---------- Browser / Context Lifecycle ----------
+
+    async def _ensure_browser(self):
+        current = self._current
+        if current and current.browser.is_connected() and current.pages < self.max_pages_per_browser:
+            return current
+
+        if current:
+            await self._retire(current)
+
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._launches += 1
+        self._current = _BrowserHandle(browser)
+        return self._current
+
+    async def _retire(self, handle):
+        handle.retired = True
+        if self._current is handle:
+            self._current = None
+        if handle.leases == 0:
+            await self._close_browser(handle)
+
+    async def _close_browser(self, handle):
+        # Drop idle contexts that belonged to this browser
+        stale = [c for c in self._idle if c.owner is handle]
+        self._idle = [c for c in self._idle if c.owner is not handle]
+        for ctx in stale:
+            await self._close_context(ctx)
+        try:
+            await handle.browser.close()
+        except Exception:
+            pass
+
+    async def _close_context(self, ctx):
+        try:
+            await ctx.context.close()
+        except Exception:
+            pass
+
+    async def _acquire(self):
+        if self._slots is None:
+            self._slots = asyncio.Condition()
+            self._launch_lock = asyncio.Lock()
+
+        async with self._slots:
+            # max_contexts is re-read on every wake-up, so ensure_contexts() applies at once
+            await self._slots.wait_for(lambda: self._in_use < self.max_contexts)
+            self._in_use += 1
+        try:
+            async with self._launch_lock:
+                owner = await self._ensure_browser()
+
+                ctx = None
+                while self._idle:
+                    candidate = self._idle.pop()
+                    if candidate.owner is owner:
+                        ctx = candidate
+                        break
+                    await self._close_context(candidate)
+
+                if ctx is None:
+                    context = await owner.browser.new_context(user_agent=self.user_agent)
+                    ctx = _ContextHandle(owner, context)
+
+                owner.leases += 1
+                owner.pages += 1
+                ctx.pages += 1
+                return ctx
+        except Exception:
+            await self._free_slot()
+            raise
+
+    async def _free_slot(self):
+        async with self._slots:
+            self._in_use -= 1
+            self._slots.notify()
+
+    async def _release(self, ctx, healthy):
+        owner = ctx.owner
+        owner.leases -= 1
+
+        reusable = (
+            healthy
+            and not owner.retired
+            and owner.browser.is_connected()
+            and ctx.pages < self.max_pages_per_context
+        )
+        if reusable:
+            self._idle.append(ctx)
+        else:
+            await self._close_context(ctx)
+
+        if owner.retired and owner.leases == 0:
+            await self._close_browser(owner)
+        elif not owner.browser.is_connected():
+            await self._retire(owner)
+
+        await self._free_slot()
+
+    async def _run(self, url, action):
+        ctx = await self._acquire()
+        healthy = True
+        page = None
+        try:
+            page = await ctx.context.new_page()
+
+            def on_crash(_):
+                nonlocal healthy
+                healthy = False
+            page.on("crash", on_crash)
+
+            return await action(page, url)
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    healthy = False
+            await self._release(ctx, healthy)
+
+    # ---------- Shutdown ----------
+
+    async def _shutdown(self):
+        for ctx in self._idle:
+            await self._close_context(ctx)
+        self._idle = []
+        if self._current:
+            try:
+                await self._current.browser.close()
+            except Exception:
+                pass
+            self._current = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def close(self):
+        """Close the browser and stop the pool thread."""
+        with self._thread_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(30)
+        except Exception as e:
+            print(f"Browser pool shutdown error: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        # Loop-side primitives are bound to the old loop; reset for a clean restart
+        self._slots = None
+        self._in_use = 0
+        self._launch_lock = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_browser_pool(user_agent=None):
+    """
+    Returns the process-wide BrowserPool, creating it on first use.
+    BROWSER_CONTEXTS pins the number of pages in flight (default: follows the callers'
+    concurrency, see BrowserPool.ensure_contexts).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            pinned = os.environ.get("BROWSER_CONTEXTS")
+            _pool = BrowserPool(
+                user_agent=user_agent,
+                max_contexts=int(pinned) if pinned else MAX_CONTEXTS,
+                pinned=bool(pinned),
+            )
+            atexit.register(_pool.close)
+        return _pool
+
+def browser_pool_stats():
+    """Stats of the process-wide BrowserPool, or {} if no scraper has used it."""
+    with _pool_lock:
+        pool = _pool
+    return pool.stats() if pool is not None else {}
@@ -0,0 +1,251 @@
+"""
+Headless batch mode: sweep many pincodes without the Streamlit UI.
+
+Each pincode runs multi_source_search, enrichment and a contact crawl of the websites
+found (site_crawler.py) in a worker process (one per core by default); every worker
+keeps its own async/thread fan-out. Workers hand leads over in batches as their
+enrichment finishes, and the parent appends them to the output file (JSONL, CSV,
+Parquet or XLSX) right away.
+JSONL and CSV are flushed per batch, so they survive a crash and can be resumed into:
+leads already written are journaled and not written again.
+
+    python cli.py 110017 110018
+    python cli.py 110001-110099 --categories BPO Hospital --workers 8
+    python cli.py --file pincodes.txt --output runs/delhi.jsonl
+
+The Serper key comes from --api-key or the SERPER_API_KEY environment variable.
+Completed work is journaled (journal.py); after a crash, rerun with --resume to skip
+finished pincodes and replay the finished tasks of interrupted ones (only when they were
+run with the same categories).
+
+Each worker enforces its own share of the per-host rate limits (rate_limiter.py divides
+them by the worker count), so the sweep as a whole stays near HOST_LIMITS; concurrency
+windows never drop below one request per worker, though. Circuit breakers
+(source_strategy.py) are per worker: a block seen by one worker doesn't pause the others
+until they hit it too. The Serper response cache is shared by all workers.
+
+Queries are planned up front for the whole sweep (query_planner.py): synonymous categories
+and pincodes sharing a locality ($PINCODE_LOCALITIES) are searched once, and
+--target-leads / --budget stop each pincode early.
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# Spawned workers re-run this module's top level: keep it to light imports.
+# scrapers (aiohttp, pandas, Playwright) and export are imported where they are used.
+from journal import get_journal, lead_key
+from query_planner import get_query_planner
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runs")
+EXPORT_BATCH = 50          # Leads per batch a worker hands to the writer
+QUEUE_POLL_SECONDS = 0.5   # How often the parent writes the batches handed over
+
+def parse_pincodes(specs):
+    """'110017', '110001-110005' or comma-separated mixes of both -> ordered unique pincodes."""
+    pincodes = []
+    for spec in specs:
+        for part in spec.replace(",", " ").split():
+            if "-" in part:
+                start, end = part.split("-", 1)
+                if not (start.isdigit() and end.isdigit()) or int(end) < int(start):
+                    raise ValueError(f"Bad pincode range: {part}")
+                pincodes.extend(str(p).zfill(len(start)) for p in range(int(start), int(end) + 1))
+            elif part.isdigit():
+                pincodes.append(part)
+            else:
+                raise ValueError(f"Bad pincode: {part}")
+    return list(dict.fromkeys(pincodes))
+
+def read_pincode_file(path):
+    """One pincode or range per line; blank lines and '#' comments are ignored."""
+    with open(path) as f:
+        return [line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip()]
+
+def process_pincode(pincode, out, categories, api_key, enrich=True, resume=False, queries=None, target_leads=None, budget=None, crawl=True):
+    """
+    Worker: discovery, enrichment and website contact crawl for one pincode, running the
+    planned `queries`.
+    Enriched leads are crawled and put on the `out` queue as (pincode, leads) batches of
+    up to EXPORT_BATCH as they finish, for the parent to write; leads a resumed job
+    already exported are skipped. Returns (pincode, leads sent, seconds).
+    Runs in a child process, which loads the scraping stack here, on its first pincode.
+    The parent marks the job finished once the leads are on disk.
+    """
+    from concurrent.futures import as_completed
+    from scrapers import iter_multi_source_search, LeadMerger
+    from enrichment import get_enrichment_pipeline
+    from metrics import get_metrics
+    from site_crawler import harvest_contacts
+
+    started = time.perf_counter()
+    metrics = get_metrics().start_run(pincode=pincode)
+    try:
+        pipeline = get_enrichment_pipeline()
+        journal = get_journal()
+        journal.start(pincode, categories, resume)
+        plan = get_query_planner().plan(pincode, categories, target_leads, budget, queries)
+
+        merger = LeadMerger()
+        futures = {}
+        for company in iter_multi_source_search(pincode, categories, api_key, journal=journal, plan=plan, merger=merger):
+            if enrich:
+                futures[pipeline.submit(company, api_key, journal, pincode)] = company
+
+        def finished_leads():
+            if not enrich:
+                yield from merger.results()
+                return
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    metrics.record_exception("cli.enrich", e)
+                yield futures[future]
+
+        exported = journal.exported_keys(pincode)
+        sent = 0
+        batch = []
+
+        def send():
+            if crawl:
+                with metrics.timer("phase.crawl"):
+                    harvest_contacts(batch)
+            for lead in batch:
+                lead["Pincode"] = pincode
+            out.put((pincode, list(batch)))
+            batch.clear()
+
+        for lead in finished_leads():
+            # Discovery is over, so merges are final: leads folded into an earlier one are dropped
+            if merger.is_retracted(lead) or lead_key(lead) in exported:
+                continue
+            batch.append(lead)
+            sent += 1
+            if len(batch) >= EXPORT_BATCH:
+                send()
+        if batch:
+            send()
+    finally:
+        # A failed pincode still closes its run, so its metrics are written
+        metrics.observe("phase.total", time.perf_counter() - started)
+        metrics.finish_run()
+    return pincode, sent, time.perf_counter() - started
+
+def main():
+    from scrapers import CATEGORIES
+    from export import FORMATS, APPENDABLE_FORMATS, ExportWriter, format_for_path
+
+    parser = argparse.ArgumentParser(description="Sweep pincodes headlessly (discovery + enrichment)")
+    parser.add_argument("pincodes", nargs="*", help="pincodes or ranges, e.g. 110017 110001-110099")
+    parser.add_argument("--file", help="file with one pincode or range per line")
+    parser.add_argument("--categories", nargs="+", default=CATEGORIES, help="categories to search")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: one per core)")
+    parser.add_argument("--output", help="output path; the format follows the extension (default: runs/leads_<ts>.jsonl)")
+    parser.add_argument("--format", choices=list(FORMATS), help="output format when --output is not given (default: jsonl)")
+    parser.add_argument("--api-key", default=os.environ.get("SERPER_API_KEY"), help="Serper API key (default: $SERPER_API_KEY)")
+    parser.add_argument("--no-enrich", action="store_true", help="discovery only, skip enrichment lookups")
+    parser.add_argument("--resume", action="store_true", help="skip pincodes finished by an earlier run and resume interrupted ones")
+    parser.add_argument("--no-crawl", action="store_true", help="don't visit company websites for more numbers and emails")
+    parser.add_argument("--target-leads", type=int, help="stop searching a pincode once it has this many leads")
+    parser.add_argument("--budget", type=float, help="stop searching a pincode after this many seconds of source queries")
+    args = parser.parse_args()
+
+    specs = list(args.pincodes)
+    if args.file:
+        specs.extend(read_pincode_file(args.file))
+    try:
+        pincodes = parse_pincodes(specs)
+    except ValueError as e:
+        parser.error(str(e))
+    if not pincodes:
+        parser.error("no pincodes given")
+    if not args.api_key:
+        parser.error("no Serper API key: pass --api-key or set SERPER_API_KEY")
+
+    planned = get_query_planner().queries(pincodes, args.categories)
+    covered = [p for p in pincodes if not planned[p]]
+    if covered:
+        print(f"Skipping {len(covered)} pincodes that share a locality with an earlier one: " + " ".join(covered))
+        pincodes = [p for p in pincodes if planned[p]]
+
+    journal = get_journal()
+    if args.resume:
+        finished = [p for p in pincodes if journal.is_finished(p, args.categories)]
+        pincodes = [p for p in pincodes if p not in finished]
+        print(f"Resuming: {len(finished)} pincodes already finished, {len(pincodes)} to go")
+        if not pincodes:
+            return
+
+    output = args.output
+    if output is None:
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        output = os.path.join(OUTPUT_DIR, f"leads_{int(time.time())}{FORMATS[args.format or 'jsonl'][1]}")
+    try:
+        fmt = args.format or format_for_path(output)
+    except ValueError as e:
+        parser.error(str(e))
+    if fmt not in APPENDABLE_FORMATS and os.path.exists(output):
+        parser.error(f"{output} exists and {fmt} files can't be appended to; pass a new --output")
+    workers = max(1, min(args.workers, len(pincodes)))
+    print(f"Sweeping {len(pincodes)} pincodes with {workers} workers -> {output}")
+
+    total_leads = 0
+    failed = []
+    started = time.perf_counter()
+    # spawn: workers start clean instead of inheriting the parent's threads and sockets
+    context = multiprocessing.get_context("spawn")
+    # Workers already take one core each; parsing inside them needs no extra process pool
+    os.environ.setdefault("PARSE_PROCESSES", "0")
+    # Spawned workers inherit this and split each host's limits between them
+    os.environ.setdefault("RATE_LIMIT_PROCESSES", str(workers))
+    with ExportWriter(output, fmt) as writer, context.Manager() as manager, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        out = manager.Queue()
+
+        def write_batches():
+            """Writes every batch the workers have handed over so far."""
+            while True:
+                try:
+                    pincode, leads = out.get_nowait()
+                except queue.Empty:
+                    return
+                writer.write(leads)
+                journal.record_exported(pincode, leads)
+
+        futures = {
+            executor.submit(
+                process_pincode, pincode, out, args.categories, args.api_key, not args.no_enrich, args.resume,
+                planned[pincode], args.target_leads, args.budget, not args.no_crawl
+            ): pincode
+            for pincode in pincodes
+        }
+        done = 0
+        while futures:
+            finished, _ = wait(futures, timeout=QUEUE_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            # A worker hands over all its batches before it returns
+            write_batches()
+            for future in finished:
+                pincode = futures.pop(future)
+                done += 1
+                try:
+                    _, sent, seconds = future.result()
+                except Exception as e:
+                    failed.append(pincode)
+                    print(f"[{done}/{len(pincodes)}] {pincode}: failed ({e})")
+                    continue
+                journal.finish(pincode)
+                total_leads += sent
+                print(f"[{done}/{len(pincodes)}] {pincode}: {sent} leads in {seconds:.1f}s")
+
+    print(f"Done: {total_leads} leads from {len(pincodes) - len(failed)} pincodes in {time.perf_counter() - started:.1f}s")
+    if failed:
+        print("Failed pincodes: " + " ".join(failed))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+from dedup import normalize_name
+from sqlite_store import SQLiteStore, cache_path
+
+DEFAULT_STORE_PATH = cache_path("companies.sqlite3")
+
+DAY = 24 * 3600
+# How long each enriched field stays fresh before it is looked up again (seconds)
+DEFAULT_MAX_AGES = {
+    "Website": 90 * DAY,
+    "Directors": 30 * DAY,
+    "Startup": 30 * DAY,
+    "Employees": 30 * DAY,
+}
+STORE_FIELDS = tuple(DEFAULT_MAX_AGES)
+# Lookups that found nothing ('N/A', no directors) are retried sooner than real answers
+NEGATIVE_MAX_AGE = 7 * DAY
+NEGATIVE_VALUES = (None, "", "N/A", [])
+
+def company_key(company):
+    """Normalized name + mobile: 'The Acme Pvt. Ltd.' / 98xxxxxxxx -> 'acme|98xxxxxxxx' (None without a name)."""
+    name = normalize_name(company.get('Company'))
+    if not name:
+        return None
+    return f"{name}|{company.get('Mobile') or ''}"
+
+class CompanyStore(SQLiteStore):
+    """
+    Local knowledge store of enriched company fields, with a timestamp per field.
+    - get() returns only the fields younger than their max age; the rest are re-queried.
+      Empty answers ('N/A', []) are kept for at most `negative_max_age`.
+    - put() upserts fields and stamps them with the current time.
+    Thread-safe; fresh/stale/missing field counters via stats(). A database error reads
+    as no fresh fields and skips the write (see SQLiteStore).
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS company_fields (
+            key TEXT NOT NULL,
+            field TEXT NOT NULL,
+            value TEXT NOT NULL,
+            updated REAL NOT NULL,
+            PRIMARY KEY (key, field)
+        );
+    """
+    TABLES = ("company_fields",)
+
+    def __init__(self, path=DEFAULT_STORE_PATH, max_ages=None, negative_max_age=NEGATIVE_MAX_AGE):
+        super().__init__(path)
+        self.max_ages = dict(DEFAULT_MAX_AGES)
+        if max_ages:
+            self.max_ages.update(max_ages)
+        self.negative_max_age = negative_max_age
+        self._stats = {"fresh": 0, "stale": 0, "missing": 0, "writes": 0}
+
+    def get(self, company):
+        """Fresh stored fields for `company` as {field: value}."""
+        key = company_key(company)
+        if key is None:
+            return {}
+        now = time.time()
+        rows = self.fetchall("SELECT field, value, updated FROM company_fields WHERE key = ?", (key,))
+        fresh = {}
+        for field, value, updated in rows:
+            value = json.loads(value)
+            max_age = self.max_ages.get(field, 0)
+            if value in NEGATIVE_VALUES:
+                max_age = min(max_age, self.negative_max_age)
+            if now - updated <= max_age:
+                fresh[field] = value
+        with self._lock:
+            self._stats["fresh"] += len(fresh)
+            self._stats["stale"] += len(rows) - len(fresh)
+            self._stats["missing"] += len(STORE_FIELDS) - len(rows)
+        return fresh
+
+    def put(self, company, fields):
+        """Stores {field: value} for `company`, stamped now."""
+        key = company_key(company)
+        if key is None:
+            return
+        now = time.time()
+        rows = [(key, field, json.dumps(value, ensure_ascii=False, default=str), now) for field, value in fields.items()]
+
+        def store(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO company_fields (key, field, value, updated) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._stats["writes"] += len(rows)
+
+        self.run(store)
+
+    def stats(self):
+        row = self.fetchone("SELECT COUNT(DISTINCT key) FROM company_fields")
+        with self._lock:
+            out = dict(self._stats)
+            out["errors"] = self.errors
+        out["companies"] = row[0] if row else None
+        return out
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_company_store():
+    """
+    Returns the process-wide CompanyStore, creating it on first use, or None when
+    COMPANY_STORE=0. COMPANY_MAX_AGE_DAYS overrides the max age of every field.
+    """
+    global _store
+    with _store_lock:
+        if _store is None and os.environ.get("COMPANY_STORE", "1") != "0":
+            max_ages = None
+            if os.environ.get("COMPANY_MAX_AGE_DAYS"):
+                age = float(os.environ["COMPANY_MAX_AGE_DAYS"]) * DAY
+                max_ages = {field: age for field in STORE_FIELDS}
+            _store = CompanyStore(max_ages=max_ages)
+        return _store
@@ -0,0 +1,175 @@
+import re
+from collections import defaultdict
+from leads import Lead, SOURCE_SEPARATOR, lead_sources, source_names
+
+# Words that don't distinguish one business from another
+LEGAL_WORDS = {
+    "pvt", "private", "ltd", "limited", "llp", "inc", "co", "company", "corp",
+    "corporation", "the", "and", "of", "india", "opc",
+}
+# Listing titles ("Top 10 BPO in 110017") are never used for name matching
+GENERIC_NAME_PATTERN = re.compile(r'\b(?:top|best|list of|near me|near)\b|\b\d{6}\b')
+NAME_CLEAN_PATTERN = re.compile(r'[^a-z0-9]+')
+
+NAME_SIMILARITY = 0.85   # Trigram Jaccard needed to merge on name alone
+MIN_NAME_LENGTH = 4      # Shorter normalized names are too ambiguous to match
+MAX_BLOCK_SIZE = 200     # Tokens shared by more entities than this are too common to block on
+
+def normalize_name(name):
+    """Lowercase, strip punctuation and legal suffixes: 'The Acme Pvt. Ltd.' -> 'acme'."""
+    if not name:
+        return ""
+    tokens = NAME_CLEAN_PATTERN.sub(" ", str(name).lower()).split()
+    return " ".join(t for t in tokens if t not in LEGAL_WORDS)
+
+def name_trigrams(normalized):
+    compact = normalized.replace(" ", "")
+    if len(compact) < 3:
+        return {compact} if compact else set()
+    return {compact[i:i + 3] for i in range(len(compact) - 2)}
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class EntityIndex:
+    """
+    Entity resolution for leads, in roughly linear time.
+    - Phone index: leads sharing a normalized mobile are the same entity.
+    - Name blocking: leads are bucketed by (scope, name token); only entities sharing a
+      block are compared, by trigram Jaccard of their normalized names.
+    - Each entity keeps a source bitmask (leads.SOURCE_CODES); its lead's 'Source' string
+      mirrors it, in source code order.
+      Extra numbers of a merged entity are kept in 'Alt_Mobiles'.
+    `scope` (e.g. the pincode) keeps name matches local, so branches of a chain in
+    different areas are not merged.
+    A later lead can link two entities whose leads were both returned already: the newer
+    one is folded into the older and listed in `retracted`; results() leaves it out.
+    """
+    def __init__(self, name_threshold=NAME_SIMILARITY, max_block=MAX_BLOCK_SIZE):
+        self.name_threshold = name_threshold
+        self.max_block = max_block
+        self.entities = []
+        self._parent = []
+        self._grams = []
+        self._sources = []
+        self._primary_phones = []
+        self._phones = {}
+        self._blocks = defaultdict(list)
+        self._eid_by_lead = {}
+        self.retracted = []
+
+    def normalize_phones(self, phones):
+        """Phone keys for a batch of raw mobiles; override to plug in stricter validation."""
+        return [str(p).strip() if p else None for p in phones]
+
+    def _find(self, eid):
+        while self._parent[eid] != eid:
+            self._parent[eid] = self._parent[self._parent[eid]]
+            eid = self._parent[eid]
+        return eid
+
+    def _name_match(self, grams, tokens, scope):
+        if not grams:
+            return None
+        seen = set()
+        best, best_score = None, self.name_threshold
+        for token in tokens:
+            block = self._blocks.get((scope, token))
+            if not block or len(block) > self.max_block:
+                continue
+            for eid in block:
+                eid = self._find(eid)
+                if eid in seen:
+                    continue
+                seen.add(eid)
+                score = jaccard(grams, self._grams[eid])
+                if score >= best_score:
+                    best, best_score = eid, score
+        return best
+
+    def _set_sources(self, eid, mask):
+        self._sources[eid] = mask
+        canonical = self.entities[eid]
+        if isinstance(canonical, Lead):
+            canonical.sources = mask
+        else:
+            canonical['Source'] = SOURCE_SEPARATOR.join(source_names(mask))
+
+    def _merge_into(self, eid, lead, phone):
+        canonical = self.entities[eid]
+        mask = lead_sources(lead)
+        if mask & ~self._sources[eid]:
+            self._set_sources(eid, self._sources[eid] | mask)
+        if phone and phone != self._primary_phones[eid] and phone not in canonical.get('Alt_Mobiles', []):
+            canonical.setdefault('Alt_Mobiles', []).append(phone)
+        if canonical.get('Website') in (None, "", "N/A") and lead.get('Website') not in (None, "", "N/A"):
+            canonical['Website'] = lead['Website']
+
+    def _union(self, keep, other):
+        """Folds entity `other` into `keep` (both roots)."""
+        self._parent[other] = keep
+        self._merge_into(keep, self.entities[other], self._primary_phones[other])
+        for phone in self.entities[other].get('Alt_Mobiles', []):
+            self._merge_into(keep, {}, phone)
+        self._set_sources(keep, self._sources[keep] | self._sources[other])
+        self.retracted.append(self.entities[other])
+
+    def add(self, leads, scope=None):
+        """
+        Adds a batch of leads. Returns the ones that started a new entity; the others
+        were merged into an existing entity's lead (same dict object as returned earlier).
+        """
+        new_leads = []
+        keys = self.normalize_phones([lead.get('Mobile') for lead in leads])
+        for lead, phone in zip(leads, keys):
+            phone = phone or lead.get('Mobile')
+            name = "" if GENERIC_NAME_PATTERN.search(str(lead.get('Company') or "").lower()) else normalize_name(lead.get('Company'))
+            usable_name = len(name.replace(" ", "")) >= MIN_NAME_LENGTH
+            tokens = name.split() if usable_name else []
+            grams = name_trigrams(name) if usable_name else set()
+
+            by_phone = self._find(self._phones[phone]) if phone in self._phones else None
+            by_name = self._name_match(grams, tokens, scope)
+
+            if by_phone is None and by_name is None:
+                eid = len(self.entities)
+                self.entities.append(lead)
+                self._parent.append(eid)
+                self._grams.append(grams)
+                self._sources.append(lead_sources(lead))
+                self._primary_phones.append(phone)
+                self._eid_by_lead[id(lead)] = eid
+                new_leads.append(lead)
+            else:
+                eid = by_phone if by_phone is not None else by_name
+                if by_phone is not None and by_name is not None and by_name != by_phone:
+                    # The lead links two known entities: keep the older one
+                    eid, other = min(by_phone, by_name), max(by_phone, by_name)
+                    self._union(eid, other)
+                self._merge_into(eid, lead, phone)
+
+            if phone and phone not in self._phones:
+                self._phones[phone] = eid
+            for token in tokens:
+                block = self._blocks[(scope, token)]
+                if len(block) <= self.max_block and (not block or block[-1] != eid):
+                    block.append(eid)
+        return new_leads
+
+    def sources(self, lead):
+        """Structured source list for a lead returned by add()."""
+        eid = self._eid_by_lead.get(id(lead))
+        if eid is None:
+            return []
+        return source_names(self._sources[self._find(eid)])
+
+    def is_retracted(self, lead):
+        """True if `lead`, returned by add(), was later folded into another entity."""
+        eid = self._eid_by_lead.get(id(lead))
+        return eid is not None and self._find(eid) != eid
+
+    def results(self):
+        """One lead per entity (entities merged after the fact are folded in)."""
+        return [self.entities[eid] for eid in range(len(self.entities)) if self._find(eid) == eid]
@@ -0,0 +1,389 @@
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from serper_client import get_serper_client
+from metrics import get_metrics
+from company_store import get_company_store
+
+# Concurrency limit per enrichment stage (each stage has its own worker pool)
+STAGE_WORKERS = {
+    "website": 8,
+    "directors": 8,
+    "startup": 4,
+    "employees": 8,
+}
+
+# Lead fields written by enrichment (replayed from the journal on resume)
+ENRICHED_FIELDS = ("Website", "Directors", "Employees", "Startup")
+# Top-level stage -> company store field that makes it unnecessary when fresh
+# (Startup is stored alongside Directors, since it is chained after that stage)
+STAGE_FIELDS = {
+    "website": "Website",
+    "directors": "Directors",
+    "employees": "Employees",
+}
+
+# Snippet patterns
+ZAUBA_DIN_PATTERN = re.compile(r'·\s([A-Z\s]+),\sDirector')
+EMPLOYEE_COUNT_PATTERN = re.compile(r"([\d,]+)(?:\+|-\d+)?\s+employees", re.IGNORECASE)
+NON_NAME_PATTERN = re.compile(r'[^a-zA-Z\s]')
+
+def parse_zauba_directors(data):
+    """Director names from a ZaubaCorp search response (top 3 results)."""
+    directors = []
+    if "organic" in data:
+        for item in data["organic"][:3]:
+            snippet = item.get("snippet", "")
+            title = item.get("title", "")
+            text = f"{title} {snippet}"
+            
+            # Pattern A: "Directors of ... are Name1, Name2"
+            if "are" in text and "Directors of" in text:
+                 parts = text.split(" are ")[-1].split(".")[0].split(",")
+                 for p in parts:
+                     clean = p.replace("and", "").strip()
+                     if len(clean) > 3: directors.append(clean)
+                     
+            # Pattern B: Zauba Table "DIN · NAME, Director"
+            # Looks for:  06413133 · PARAG ALLAWADI, Director
+            matches = ZAUBA_DIN_PATTERN.findall(text)
+            if matches:
+                directors.extend([m.strip() for m in matches])
+    return directors
+
+def parse_linkedin_directors(data, company_name, directors=None):
+    """Adds names from 'Name - Director - Company' style titles (top 2 results)."""
+    directors = [] if directors is None else directors
+    if "organic" in data:
+         for item in data["organic"][:2]:
+             title = item.get("title", "")
+             # accepted patterns: "Name - Director - Company"
+             if " - " in title:
+                 parts = title.split(" - ")
+                 for part in parts:
+                     if part.strip() not in [company_name, "Director", "Owner", "Profile", "LinkedIn"] and len(part.split()) < 4:
+                         if part.strip() not in directors:
+                             directors.append(part.strip())
+                             break
+    return directors
+
+def clean_director_names(directors):
+    """Strips non-letters, drops duplicates and short names, keeps the first 3."""
+    unique_directors = []
+    for d in directors:
+        d_clean = NON_NAME_PATTERN.sub('', d).strip()
+        if d_clean and d_clean not in unique_directors and len(d_clean) > 3:
+            unique_directors.append(d_clean)
+            
+    return unique_directors[:3]
+
+def get_zauba_directors(company_name, api_key):
+    """
+    Extracts director names directly from Google Snippets.
+    Updated for robust Zauba patterns.
+    Raises if no directors were found and a search failed.
+    """
+    directors = []
+    error = None
+    
+    # Query 1: ZaubaCorp specific
+    serper = get_serper_client()
+    payload = {
+        "q": f"{company_name} directors site:zaubacorp.com",
+        "gl": "in"
+    }
+    
+    try:
+        data = serper.search(payload, api_key)
+        directors = parse_zauba_directors(data)
+    except Exception as e:
+        get_metrics().record_exception("enrich.zauba", e)
+        error = e
+        
+    # Query 2: Generic "Owner/Director" search if Zauba fails
+    if not directors:
+        try:
+            payload = {
+                "q": f"{company_name} owner director linkedin",
+                "gl": "in"
+            }
+            data = serper.search(payload, api_key)
+            parse_linkedin_directors(data, company_name, directors)
+        except Exception as e:
+             get_metrics().record_exception("enrich.linkedin_directors", e)
+             error = e
+
+    # Nobody found and a query failed: that's a failed lookup, not an answer
+    if not directors and error is not None:
+        raise error
+    # Clean duplicates
+    return clean_director_names(directors)
+
+def get_startup_india_founders(company_name, api_key):
+    """
+    Search Startup India for Founder details if potential startup.
+    Raises if the search fails.
+    """
+    payload = {
+        "q": f"site:startupindia.gov.in {company_name} founder",
+        "gl": "in"
+    }
+    
+    founders = []
+    try:
+        data = get_serper_client().search(payload, api_key)
+        if "organic" in data:
+            for item in data["organic"][:2]:
+                snippet = item.get("snippet", "")
+                # Simple extraction: Look for names after keywords
+                # This is heuristic
+                if "Founder" in snippet or "Director" in snippet:
+                    founders.append(item.get("title").split("-")[0].strip())
+    except Exception as e:
+        get_metrics().record_exception("enrich.startup_india", e)
+        raise
+    return list(set(founders))
+
+def find_website(company_name, api_key):
+    """Finds website if missing ('N/A' if there is none). Raises if the search fails."""
+    payload = {
+        "q": f"{company_name} official website",
+        "gl": "in"
+    }
+    try:
+        data = get_serper_client().search(payload, api_key)
+        if "organic" in data and len(data["organic"]) > 0:
+            link = data["organic"][0]["link"]
+            if "justdial" not in link and "indiamart" not in link and "sulekha" not in link:
+                return link
+    except Exception as e:
+        get_metrics().record_exception("enrich.website", e)
+        raise
+    return "N/A"
+
+def parse_employee_count(data):
+    """
+    Employee count from the top LinkedIn search result.
+    Returns: (count, snippet_text, linkedin_url)
+    """
+    organic = data.get("organic", [])
+    if not organic:
+        return None, "", None
+        
+    result = organic[0]
+    snippet = result.get("snippet", "")
+    title = result.get("title", "")
+    link = result.get("link", "")
+    full_text = snippet + " " + title
+    
+    # Extract employee count
+    emp_count = None
+    match = EMPLOYEE_COUNT_PATTERN.search(full_text)
+    if match:
+        count_str = match.group(1).replace(',', '')
+        try:
+            emp_count = int(count_str)
+        except ValueError:
+            emp_count = None
+    
+    return emp_count, snippet, link
+
+def get_employee_count(company_name, api_key):
+    """
+    Searches Google for LinkedIn employee count.
+    Returns: (count, snippet_text, linkedin_url). Raises if the search fails.
+    """
+    payload = {
+        "q": f"{company_name} linkedin employee count",
+        "gl": "in"
+    }
+
+    try:
+        data = get_serper_client().search(payload, api_key)
+        return parse_employee_count(data)
+    except Exception as e:
+        get_metrics().record_exception("enrich.employees", e)
+        raise
+
+def _journal_enriched(journal, pincode, company):
+    try:
+        journal.record_enriched(pincode, company)
+    except Exception as e:
+        get_metrics().record_exception("journal", e)
+
+def _timed(stage, fn, *args):
+    """Runs one lookup, recording its latency as 'lookup.<stage>'."""
+    with get_metrics().timer(f"lookup.{stage}"):
+        return fn(*args)
+
+class EnrichmentPipeline:
+    """
+    Staged enrichment for leads:
+    - Website, Directors (Zauba) and Employees (LinkedIn) lookups run concurrently.
+    - Startup India founders are chained after Directors, only when no directors were found.
+    - Each stage has its own worker pool, so one slow lookup type can't starve the others.
+    Per-lead latency approaches the slowest lookup instead of the sum.
+    With a `store`, stages whose fields are still fresh there are skipped, and new
+    results are written back.
+    """
+    def __init__(self, stage_workers=None, store=None):
+        workers = dict(STAGE_WORKERS)
+        if stage_workers:
+            workers.update(stage_workers)
+        self.store = store
+        self.executors = {
+            stage: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"enrich-{stage}")
+            for stage, n in workers.items()
+        }
+
+    def submit(self, company, api_key, journal=None, pincode=None):
+        """
+        Starts enrichment of `company` (a lead dict, updated in place).
+        Returns a Future that resolves to the company once every stage has finished.
+        Failed lookups leave their fields at the defaults, as with the sequential version,
+        and are not written to the store, so the next run looks them up again.
+        With a `journal`, a lead already enriched in this pincode's job is filled in from it,
+        and newly enriched leads are recorded once every lookup succeeded (a lead with
+        failed lookups is enriched again on resume).
+        """
+        done = Future()
+        failed = set()  # Stages whose lookup raised: their defaults are not answers
+        if journal is not None:
+            stored = journal.enriched_lead(pincode, company)
+            if stored is not None:
+                company.update({k: stored[k] for k in ENRICHED_FIELDS if k in stored})
+                get_metrics().incr("journal.enriched_replayed")
+                done.set_result(company)
+                return done
+            def journal_if_complete(f):
+                if not failed:
+                    _journal_enriched(journal, pincode, company)
+            done.add_done_callback(journal_if_complete)
+        name = company['Company']
+        company.setdefault("Website", "N/A")
+        company["Directors"] = []
+        company["Employees"] = "N/A"
+
+        # Fields still fresh in the company store are reused instead of re-queried
+        known = self.store.get(company) if self.store is not None else {}
+        metrics = get_metrics()
+        metrics.incr("store.fields_reused", len(known))
+        if "Website" in known and (known["Website"] != "N/A" or company["Website"] == "N/A"):
+            company["Website"] = known["Website"]
+        if "Directors" in known:
+            company["Directors"] = list(known["Directors"])
+            if known.get("Startup"):
+                company["Startup"] = True
+        if "Employees" in known:
+            company["Employees"] = known["Employees"]
+
+        stages = [stage for stage, field in STAGE_FIELDS.items() if field not in known]
+        if not stages:
+            done.set_result(company)
+            return done
+
+        lock = threading.Lock()
+        pending = [len(stages)]
+
+        def remember(fields):
+            if self.store is None:
+                return
+            try:
+                self.store.put(company, fields)
+            except Exception as e:
+                metrics.record_exception("company_store", e)
+
+        def finish_one():
+            with lock:
+                pending[0] -= 1
+                last = pending[0] == 0
+            if last:
+                done.set_result(company)
+
+        def on_website(f):
+            if f.exception():
+                failed.add("website")
+            else:
+                company["Website"] = f.result()
+                remember({"Website": company["Website"]})
+            finish_one()
+
+        def on_employees(f):
+            if f.exception():
+                failed.add("employees")
+            else:
+                emp_count, _, _ = f.result()
+                company["Employees"] = emp_count if emp_count else "N/A"
+                remember({"Employees": company["Employees"]})
+            finish_one()
+
+        def on_founders(f):
+            if f.exception():
+                failed.add("startup")
+            else:
+                if f.result():
+                    company["Directors"].extend(f.result())
+                    company["Startup"] = True
+                # Founders alone don't answer Directors if the Zauba lookup failed
+                if "directors" not in failed:
+                    remember({"Directors": company["Directors"], "Startup": bool(company.get("Startup"))})
+            finish_one()
+
+        def on_directors(f):
+            if f.exception():
+                failed.add("directors")
+            directors = [] if f.exception() else f.result()
+            company["Directors"] = directors
+            if directors:
+                remember({"Directors": directors, "Startup": False})
+                finish_one()
+                return
+            # Dependent stage: Startup India only when Zauba found nobody
+            try:
+                self.executors["startup"].submit(_timed, "startup", get_startup_india_founders, name, api_key).add_done_callback(on_founders)
+            except RuntimeError:
+                finish_one()  # Pipeline shut down
+
+        lookups = {
+            "website": (find_website, on_website),
+            "directors": (get_zauba_directors, on_directors),
+            "employees": (get_employee_count, on_employees),
+        }
+        for stage in stages:
+            lookup, callback = lookups[stage]
+            self.executors[stage].submit(_timed, stage, lookup, name, api_key).add_done_callback(callback)
+        return done
+
+    def close(self):
+        for executor in self.executors.values():
+            executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+def get_enrichment_pipeline():
+    """Returns the process-wide EnrichmentPipeline, creating it on first use."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = EnrichmentPipeline(store=get_company_store())
+        return _pipeline
+
+def enrich_single_company(company, api_key):
+    """
+    Performs deep research on a single company:
+    1. Find Website
+    2. Find Directors (Zauba)
+    3. Find Founders (Startup India)
+    4. Find Employee Count (LinkedIn)
+    Independent lookups run concurrently through the shared EnrichmentPipeline;
+    fields still fresh in the company store are read from it instead.
+    """
+    return get_enrichment_pipeline().submit(company, api_key).result()
@@ -0,0 +1,154 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import pandas as pd
+from leads import FIELDS, json_default
+try:
+    import pyarrow  # Optional: Parquet export
+    import pyarrow.parquet as pq
+except ImportError:
+    pyarrow = pq = None
+try:
+    import openpyxl  # Optional: XLSX export
+except ImportError:
+    openpyxl = None
+
+# Export layout (fixed, so appended batches always line up)
+EXPORT_COLUMNS = list(FIELDS)
+LIST_COLUMNS = ("Directors", "Alt_Mobiles", "Emails")
+
+# Format -> (mime type, file extension)
+FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "jsonl": ("application/x-ndjson", ".jsonl"),
+}
+# Formats that can be reopened and appended to (the others are written in one go)
+APPENDABLE_FORMATS = ("csv", "jsonl")
+
+def available_formats():
+    """Export formats whose optional dependency is installed."""
+    return [fmt for fmt in FORMATS if (fmt != "parquet" or pq is not None) and (fmt != "xlsx" or openpyxl is not None)]
+
+def format_for_path(path):
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, (_, fmt_ext) in FORMATS.items():
+        if ext == fmt_ext:
+            return fmt
+    raise ValueError(f"Unknown export format for {path}")
+
+def content_hash(results):
+    """Stable digest of a result set; identical leads give identical exports."""
+    body = json.dumps(results, sort_keys=True, ensure_ascii=False, default=json_default)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+def export_row(lead):
+    """Flat, all-text row: lists joined with ', ', missing values as ''."""
+    row = {}
+    for col in EXPORT_COLUMNS:
+        value = lead.get(col)
+        if isinstance(value, list):
+            value = ", ".join(str(v) for v in value)
+        row[col] = "" if value is None else str(value)
+    return row
+
+def export_frame(results):
+    return pd.DataFrame([export_row(lead) for lead in results], columns=EXPORT_COLUMNS)
+
+def export_bytes(results, fmt="csv"):
+    """The whole result set as one file in `fmt`."""
+    if fmt == "jsonl":
+        return "".join(json.dumps(lead, ensure_ascii=False, default=json_default) + "\n" for lead in results).encode("utf-8")
+    df = export_frame(results)
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    buf = io.BytesIO()
+    if fmt == "parquet":
+        df.to_parquet(buf, index=False)
+    elif fmt == "xlsx":
+        df.to_excel(buf, index=False, sheet_name="Leads", engine="openpyxl")
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return buf.getvalue()
+
+class ExportWriter:
+    """
+    Streams leads to a file batch by batch, without holding the table in memory.
+    - csv / jsonl: appended and fsynced after every batch, so a crash loses nothing written.
+    - parquet: one row group per batch; the file is only readable after close().
+    - xlsx: write-only workbook, saved on close().
+    """
+    def __init__(self, path, fmt=None, append=True):
+        self.path = path
+        self.fmt = fmt or format_for_path(path)
+        self.rows = 0
+        self._file = None
+        self._csv = None
+        self._parquet = None
+        self._workbook = None
+        self._sheet = None
+
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if self.fmt in APPENDABLE_FORMATS:
+            self._file = open(path, "a" if append else "w", encoding="utf-8", newline="")
+            if self.fmt == "csv":
+                self._csv = csv.DictWriter(self._file, fieldnames=EXPORT_COLUMNS)
+                if not (append and exists):
+                    self._csv.writeheader()
+        elif append and exists:
+            raise ValueError(f"Can't append to an existing {self.fmt} file: {path}")
+        elif self.fmt == "parquet":
+            if pq is None:
+                raise ImportError("Parquet export needs pyarrow")
+            schema = pyarrow.schema([(col, pyarrow.string()) for col in EXPORT_COLUMNS])
+            self._parquet = pq.ParquetWriter(path, schema)
+        elif self.fmt == "xlsx":
+            if openpyxl is None:
+                raise ImportError("XLSX export needs openpyxl")
+            self._workbook = openpyxl.Workbook(write_only=True)
+            self._sheet = self._workbook.create_sheet("Leads")
+            self._sheet.append(EXPORT_COLUMNS)
+        else:
+            raise ValueError(f"Unknown export format: {self.fmt}")
+
+    def write(self, leads):
+        """Appends a batch of leads; returns how many rows were written."""
+        if not leads:
+            return 0
+        if self.fmt == "jsonl":
+            for lead in leads:
+                self._file.write(json.dumps(lead, ensure_ascii=False, default=json_default) + "\n")
+        elif self.fmt == "csv":
+            self._csv.writerows(export_row(lead) for lead in leads)
+        elif self.fmt == "parquet":
+            rows = [export_row(lead) for lead in leads]
+            self._parquet.write_table(pyarrow.Table.from_pylist(rows, schema=self._parquet.schema))
+        else:
+            for lead in leads:
+                row = export_row(lead)
+                self._sheet.append([row[col] for col in EXPORT_COLUMNS])
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self.rows += len(leads)
+        return len(leads)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        if self._workbook is not None:
+            self._workbook.save(self.path)
+            self._workbook = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
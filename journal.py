@@ -0,0 +1,212 @@
+import json
+import threading
+import time
+from leads import Lead, json_default
+from sqlite_store import SQLiteStore, cache_path
+from query_planner import canonical_category
+
+DEFAULT_JOURNAL_PATH = cache_path("journal.sqlite3")
+
+def lead_key(lead):
+    """Identity of a deduplicated lead within its pincode."""
+    return f"{lead.get('Company')}|{lead.get('Mobile')}"
+
+def category_set(categories):
+    """Order- and synonym-independent key of a job's categories: '["BPO", "Hospital"]'."""
+    return json.dumps(sorted(set(canonical_category(c) for c in categories)))
+
+class Journal(SQLiteStore):
+    """
+    SQLite (WAL) journal of completed work. Each start() of a pincode opens a job for its
+    category set; work rows are only ever appended, per job:
+    - job_runs: one row per job (pincode, category set), stamped when it finishes
+    - task_results: raw leads of each finished (source, category) discovery query
+    - enriched_leads: each lead once its enrichment has finished
+    - exported_leads: keys of the leads already written to the CLI's output file
+    A resumed job replays its own journaled queries and enrichments instead of repeating
+    them. A job only resumes with the same category set; other categories start a new job.
+    Safe to share between threads and between worker processes; a database error reads
+    as nothing journaled, so the work is redone (see SQLiteStore).
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS job_runs (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pincode TEXT NOT NULL,
+            categories TEXT NOT NULL,
+            started REAL NOT NULL,
+            finished REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_job_runs_pincode ON job_runs(pincode, job_id);
+        CREATE TABLE IF NOT EXISTS task_results (
+            job_id INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            category TEXT NOT NULL,
+            leads TEXT NOT NULL,
+            created REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_task_results_query ON task_results(job_id, source, category);
+        CREATE TABLE IF NOT EXISTS enriched_leads (
+            job_id INTEGER NOT NULL,
+            lead_key TEXT NOT NULL,
+            lead TEXT NOT NULL,
+            created REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_enriched_leads_key ON enriched_leads(job_id, lead_key);
+        CREATE TABLE IF NOT EXISTS exported_leads (
+            job_id INTEGER NOT NULL,
+            lead_key TEXT NOT NULL,
+            created REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_exported_leads_job ON exported_leads(job_id);
+    """
+    TABLES = ("job_runs", "task_results", "enriched_leads", "exported_leads")
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        super().__init__(path)
+        self._jobs = {}  # pincode -> job_id opened by start() in this process
+        self._stats = {"tasks_replayed": 0, "tasks_written": 0, "enriched_replayed": 0, "enriched_written": 0}
+
+    def _latest_job(self, pincode):
+        """(job_id, categories, finished) of the newest job for `pincode`, or None."""
+        return self.fetchone(
+            "SELECT job_id, categories, finished FROM job_runs WHERE pincode = ? ORDER BY job_id DESC LIMIT 1",
+            (pincode,)
+        )
+
+    def _job_id(self, pincode):
+        with self._lock:
+            job_id = self._jobs.get(pincode)
+        if job_id is None:
+            row = self._latest_job(pincode)
+            job_id = row[0] if row else None
+        return job_id
+
+    def start(self, pincode, categories, resume=True):
+        """
+        Opens the job for `pincode` and `categories`. With resume=True an unfinished job for
+        the same category set keeps its journaled work; otherwise a new job starts.
+        Returns True when earlier work is being resumed.
+        """
+        key = category_set(categories)
+
+        def open_job(conn):
+            row = conn.execute(
+                "SELECT job_id, categories, finished FROM job_runs WHERE pincode = ? ORDER BY job_id DESC LIMIT 1",
+                (pincode,)
+            ).fetchone()
+            if resume and row is not None and row[2] is None and row[1] == key:
+                return row[0], True
+            if resume and row is not None and row[2] is None:
+                print(f"Journal: {pincode} was interrupted with categories {row[1]}, not {key}; starting over")
+            cursor = conn.execute(
+                "INSERT INTO job_runs (pincode, categories, started) VALUES (?, ?, ?)",
+                (pincode, key, time.time())
+            )
+            return cursor.lastrowid, False
+
+        job_id, resuming = self.run(open_job, default=(None, False))
+        with self._lock:
+            self._jobs[pincode] = job_id
+        return resuming
+
+    def finish(self, pincode):
+        job_id = self._job_id(pincode)
+        if job_id is not None:
+            self.execute("UPDATE job_runs SET finished = ? WHERE job_id = ?", (time.time(), job_id))
+
+    def is_finished(self, pincode, categories=None):
+        """True if the newest job for `pincode` finished (for the same `categories`, if given)."""
+        row = self._latest_job(pincode)
+        if row is None or row[2] is None:
+            return False
+        return categories is None or row[1] == category_set(categories)
+
+    def task_result(self, pincode, source, category):
+        """Journaled leads of a discovery query in the current job, or None if it has not completed."""
+        job_id = self._job_id(pincode)
+        if job_id is None:
+            return None
+        row = self.fetchone(
+            "SELECT leads FROM task_results WHERE job_id = ? AND source = ? AND category = ? ORDER BY rowid DESC LIMIT 1",
+            (job_id, source, category)
+        )
+        if row is None:
+            return None
+        with self._lock:
+            self._stats["tasks_replayed"] += 1
+        return [Lead(lead) for lead in json.loads(row[0])]
+
+    def record_task(self, pincode, source, category, leads):
+        job_id = self._job_id(pincode)
+        if job_id is None:
+            return
+        body = json.dumps(leads, ensure_ascii=False, default=json_default)
+        if self.execute(
+            "INSERT INTO task_results (job_id, source, category, leads, created) VALUES (?, ?, ?, ?, ?)",
+            (job_id, source, category, body, time.time())
+        ):
+            with self._lock:
+                self._stats["tasks_written"] += 1
+
+    def enriched_lead(self, pincode, lead):
+        """Journaled enriched copy of `lead` in the current job, or None."""
+        job_id = self._job_id(pincode)
+        if job_id is None:
+            return None
+        row = self.fetchone(
+            "SELECT lead FROM enriched_leads WHERE job_id = ? AND lead_key = ? ORDER BY rowid DESC LIMIT 1",
+            (job_id, lead_key(lead))
+        )
+        if row is None:
+            return None
+        with self._lock:
+            self._stats["enriched_replayed"] += 1
+        return json.loads(row[0])
+
+    def record_enriched(self, pincode, lead):
+        job_id = self._job_id(pincode)
+        if job_id is None:
+            return
+        body = json.dumps(lead, ensure_ascii=False, default=json_default)
+        if self.execute(
+            "INSERT INTO enriched_leads (job_id, lead_key, lead, created) VALUES (?, ?, ?, ?)",
+            (job_id, lead_key(lead), body, time.time())
+        ):
+            with self._lock:
+                self._stats["enriched_written"] += 1
+
+    def exported_keys(self, pincode):
+        """lead_key()s of the current job's leads already written out (see record_exported)."""
+        job_id = self._job_id(pincode)
+        if job_id is None:
+            return set()
+        rows = self.fetchall("SELECT lead_key FROM exported_leads WHERE job_id = ?", (job_id,))
+        return {row[0] for row in rows}
+
+    def record_exported(self, pincode, leads):
+        job_id = self._job_id(pincode)
+        if job_id is None:
+            return
+        now = time.time()
+        rows = [(job_id, lead_key(lead), now) for lead in leads]
+        self.run(lambda conn: conn.executemany(
+            "INSERT INTO exported_leads (job_id, lead_key, created) VALUES (?, ?, ?)", rows
+        ))
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+            out["errors"] = self.errors
+        return out
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+def get_journal():
+    """Returns the process-wide Journal, creating it on first use."""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = Journal()
+        return _journal
@@ -0,0 +1,188 @@
+import threading
+from collections.abc import Mapping, MutableMapping
+
+class CodeTable:
+    """
+    Interns strings as small integer codes, process-wide and thread-safe.
+    Codes are only meaningful inside one process: anything pickled or stored uses names.
+    """
+    def __init__(self, names=()):
+        self._codes = {}
+        self._names = []
+        self._lock = threading.Lock()
+        for name in names:
+            self.code(name)
+
+    def code(self, name):
+        code = self._codes.get(name)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(name)
+                if code is None:
+                    code = self._codes[name] = len(self._names)
+                    self._names.append(name)
+        return code
+
+    def name(self, code):
+        return self._names[code]
+
+    def __len__(self):
+        return len(self._names)
+
+CATEGORY_CODES = CodeTable()
+# Bit i of a lead's source mask is source code i. Known sources are registered first,
+# so their bits, and the order of merged 'Source' strings, are the same in every process.
+SOURCE_CODES = CodeTable((
+    "Justdial", "IndiaMART", "Sulekha", "Google Maps",
+    "justdial.com (via Google)", "indiamart.com (via Google)", "sulekha.com (via Google)",
+))
+SOURCE_SEPARATOR = ", "
+
+_source_masks = {}  # Source string -> mask; there are only a handful of distinct strings
+
+def source_mask(source):
+    """'Justdial, Google Maps' -> bitmask of source codes (0 for no source)."""
+    if not source:
+        return 0
+    mask = _source_masks.get(source)
+    if mask is None:
+        mask = 0
+        for name in str(source).split(SOURCE_SEPARATOR):
+            mask |= 1 << SOURCE_CODES.code(name)
+        _source_masks[source] = mask
+    return mask
+
+def source_names(mask):
+    """Source names in a bitmask, in code order."""
+    names = []
+    code = 0
+    while mask:
+        if mask & 1:
+            names.append(SOURCE_CODES.name(code))
+        mask >>= 1
+        code += 1
+    return names
+
+def lead_sources(lead):
+    """Source bitmask of a Lead or a plain lead dict."""
+    return lead.sources if isinstance(lead, Lead) else source_mask(lead.get('Source'))
+
+def json_default(obj):
+    """json.dumps default= hook: Leads (and other mappings) as objects, anything else as str."""
+    return dict(obj) if isinstance(obj, Mapping) else str(obj)
+
+# Lead fields, in export order
+FIELDS = (
+    "Company", "Mobile", "Alt_Mobiles", "Category", "Source", "Website",
+    "Directors", "Employees", "Startup", "Pincode", "Raw_Phone", "Emails",
+)
+_SAME_AS_MOBILE = object()  # Raw_Phone equal to Mobile is not stored twice
+
+class Lead(MutableMapping):
+    """
+    Compact lead record with the dict interface the scrapers, dedup, enrichment and
+    export already use (lead['Company'], .get(), .setdefault(), .update(), dict(lead)).
+    - Fields live in __slots__: no per-lead dict or key strings. An unset slot is a
+      missing key, as in a dict.
+    - Category is an interned code (CATEGORY_CODES) and Source a bitmask of source codes
+      (SOURCE_CODES); both read back as the usual strings.
+    - Raw_Phone equal to Mobile is stored as a marker, not a second string.
+    - Unknown keys go to a small overflow dict, created on first use.
+    Pickles (e.g. from CLI worker processes) by field names, never by codes.
+    """
+    __slots__ = (
+        "_company", "_mobile", "_alt_mobiles", "_category", "_sources", "_website",
+        "_directors", "_employees", "_startup", "_pincode", "_raw_phone", "_emails", "_extra",
+    )
+
+    def __init__(self, *args, **fields):
+        if len(args) == 1 and not fields and type(args[0]) is dict:
+            # Fast path for the scrapers' lead dicts (MutableMapping.update is much slower)
+            for key, value in args[0].items():
+                slot = _PLAIN_SLOTS.get(key)
+                if slot is not None:
+                    setattr(self, slot, value)
+                elif key == "Category":
+                    self._category = CATEGORY_CODES.code(value)
+                elif key == "Source":
+                    self._sources = source_mask(value)
+                else:
+                    self[key] = value
+        elif args or fields:
+            self.update(*args, **fields)
+
+    @property
+    def sources(self):
+        """Source bitmask (see SOURCE_CODES)."""
+        return getattr(self, "_sources", 0)
+
+    @sources.setter
+    def sources(self, mask):
+        self._sources = mask
+
+    def __getitem__(self, key):
+        slot = _SLOTS.get(key)
+        if slot is None:
+            extra = getattr(self, "_extra", None)
+            if extra is None or key not in extra:
+                raise KeyError(key)
+            return extra[key]
+        try:
+            value = getattr(self, slot)
+        except AttributeError:
+            raise KeyError(key) from None
+        if slot == "_category":
+            return CATEGORY_CODES.name(value)
+        if slot == "_sources":
+            return SOURCE_SEPARATOR.join(source_names(value)) or None
+        if value is _SAME_AS_MOBILE:
+            return getattr(self, "_mobile", None)
+        return value
+
+    def __setitem__(self, key, value):
+        slot = _SLOTS.get(key)
+        if slot is None:
+            extra = getattr(self, "_extra", None)
+            if extra is None:
+                extra = self._extra = {}
+            extra[key] = value
+        elif slot == "_category":
+            self._category = CATEGORY_CODES.code(value)
+        elif slot == "_sources":
+            self._sources = source_mask(value)
+        elif slot == "_raw_phone" and value is not None and value == getattr(self, "_mobile", None):
+            self._raw_phone = _SAME_AS_MOBILE
+        else:
+            setattr(self, slot, value)
+
+    def __delitem__(self, key):
+        slot = _SLOTS.get(key)
+        try:
+            if slot is None:
+                del self._extra[key]
+            else:
+                delattr(self, slot)
+        except (AttributeError, KeyError):
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        for key, slot in _SLOTS.items():
+            if hasattr(self, slot):
+                yield key
+        yield from getattr(self, "_extra", None) or ()
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Lead({dict(self)!r})"
+
+    def __reduce__(self):
+        return (Lead, (dict(self),))
+
+    def copy(self):
+        return Lead(self)
+
+_SLOTS = dict(zip(FIELDS, Lead.__slots__))
+# Fields stored as given, without encoding
+_PLAIN_SLOTS = {key: slot for key, slot in _SLOTS.items() if key not in ("Category", "Source", "Raw_Phone")}
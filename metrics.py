@@ -0,0 +1,229 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from serper_client import get_serper_client
+from rate_limiter import get_rate_limiter
+from source_strategy import get_source_strategy
+from query_planner import get_query_planner
+from browser_pool import browser_pool_stats
+
+METRICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runs")
+
+# Latency histogram bucket upper bounds (seconds)
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 45, 90, float("inf")]
+
+class Histogram:
+    """Fixed-bucket latency histogram with count/sum/min/max."""
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (0-100)."""
+        if not self.count:
+            return None
+        target = self.count * q / 100
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else None,
+            "min": self.min,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": self.max,
+            "total": self.total,
+            "buckets": {str(b): n for b, n in zip(self.buckets, self.counts) if n},
+        }
+
+class Run:
+    """
+    Metrics of one run (a search or a CLI pincode), from Metrics.start_run() to finish_run().
+    - histograms: latency per source ("source.*"), lookup ("lookup.*") and phase ("phase.*")
+    - counters: leads, bytes, swallowed exceptions by type ("exceptions.<where>.<Type>")
+    - snapshot() adds Serper call/query counts, cache hits and rate limiter state as
+      deltas since the run started, plus per-source fetch strategy state and query yield history.
+    Recording on the run itself (phase timings) only affects this run. Thread-safe.
+    """
+    def __init__(self, owner, info):
+        self._owner = owner
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.info = dict(info)
+        self.started = time.time()
+        self.finished = None
+        self.overlapping = 0  # Other runs active at some point during this one
+        self._serper_start = _serper_stats()
+        self._cache_start = _cache_stats()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram()
+            hist.observe(seconds)
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def record_exception(self, where, exc):
+        """Counts an exception that was caught and swallowed at `where`."""
+        self.incr(f"exceptions.{where}.{type(exc).__name__}")
+
+    def snapshot(self):
+        with self._lock:
+            out = {
+                "info": dict(self.info),
+                "started": self.started,
+                "finished": self.finished,
+                "overlapping_runs": self.overlapping,
+                "histograms": {name: h.summary() for name, h in sorted(self.histograms.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+            serper_start = self._serper_start
+            cache_start = self._cache_start
+
+        out["serper"] = _delta(_serper_stats(), serper_start)
+        for row in out["serper"].values():
+            row["latency_avg"] = row["latency_total"] / row["calls"] if row.get("calls") else 0.0
+        out["cache"] = _delta(_cache_stats(), cache_start)
+        lookups = out["cache"].get("hits", 0) + out["cache"].get("misses", 0)
+        if out["cache"]:
+            out["cache"]["hit_rate"] = out["cache"]["hits"] / lookups if lookups else 0.0
+        out["rate_limiter"] = _rate_limiter_stats()
+        out["sources"] = get_source_strategy().stats()
+        out["queries"] = _query_stats()
+        out["browser"] = browser_pool_stats()
+        return out
+
+    def finish_run(self, path=None):
+        """Marks the run finished, writes it as JSON and returns (snapshot, path)."""
+        self._owner._end(self)
+        with self._lock:
+            self.finished = time.time()
+        snapshot = self.snapshot()
+        if path is None:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            label = "_".join(str(v) for v in snapshot["info"].values()) or "run"
+            path = os.path.join(METRICS_DIR, f"metrics_{label}_{int(self.started)}.json")
+        with open(path, "w") as f:
+            json.dump(snapshot, f, indent=2, default=str)
+        return snapshot, path
+
+class Metrics:
+    """
+    Process-wide instrumentation shared by scrapers, enrichment and the UI.
+    Every observe()/incr() is added to each run currently active (start_run()), so a
+    run started in another Streamlit session never resets one in progress. Process-wide
+    sources (Serper client, shared lookups) can't tell runs apart: while runs overlap,
+    each one also counts the other's activity (see 'overlapping_runs' in the snapshot).
+    Thread-safe.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs = []
+
+    def start_run(self, **info):
+        """Starts a Run: metrics recorded from now until its finish_run()."""
+        run = Run(self, info)
+        with self._lock:
+            for other in self._runs:
+                other.overlapping += 1
+            run.overlapping = len(self._runs)
+            self._runs.append(run)
+        return run
+
+    def _end(self, run):
+        with self._lock:
+            if run in self._runs:
+                self._runs.remove(run)
+
+    def _active(self):
+        with self._lock:
+            return list(self._runs)
+
+    def observe(self, name, seconds):
+        for run in self._active():
+            run.observe(name, seconds)
+
+    def incr(self, name, n=1):
+        for run in self._active():
+            run.incr(name, n)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def record_exception(self, where, exc):
+        """Counts an exception that was caught and swallowed at `where`."""
+        self.incr(f"exceptions.{where}.{type(exc).__name__}")
+
+def _serper_stats():
+    return get_serper_client().stats()
+
+def _cache_stats():
+    cache = get_serper_client().cache
+    return cache.stats() if cache is not None else {}
+
+def _rate_limiter_stats():
+    return get_rate_limiter().stats()
+
+def _query_stats():
+    stats = get_query_planner().stats
+    return stats.stats() if stats is not None else {}
+
+def _delta(now, start):
+    """Numeric fields of `now` minus `start`, recursively (maxima and sizes are kept as-is)."""
+    out = {}
+    for key, value in now.items():
+        base = start.get(key) if isinstance(start, dict) else None
+        if isinstance(value, dict):
+            out[key] = _delta(value, base or {})
+        elif isinstance(value, (int, float)) and isinstance(base, (int, float)) and key not in ("latency_max", "entries"):
+            out[key] = value - base
+        else:
+            out[key] = value
+    return out
+
+
+_metrics = Metrics()
+
+def get_metrics():
+    """Returns the process-wide Metrics instance."""
+    return _metrics
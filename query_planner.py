@@ -0,0 +1,264 @@
+import collections
+import csv
+import os
+import re
+import threading
+import time
+from sqlite_store import SQLiteStore, cache_path
+
+DEFAULT_STATS_PATH = cache_path("query_stats.sqlite3")
+
+# Discovery sources, in the order used to break priority ties
+PLANNER_SOURCES = ("justdial", "indiamart", "sulekha", "google_places")
+
+# Category spellings that return the same listings -> the category they are searched as
+CATEGORY_SYNONYMS = {
+    "bpo": "BPO",
+    "call center": "BPO",
+    "call centre": "BPO",
+    "call centers": "BPO",
+    "call centres": "BPO",
+    "corporate house": "Corporate House",
+    "corporate office": "Corporate House",
+    "corporate offices": "Corporate House",
+    "hospital": "Hospital",
+    "hospitals": "Hospital",
+    "manufacturing": "Manufacturing",
+    "manufacturer": "Manufacturing",
+    "manufacturers": "Manufacturing",
+    "manufacturing company": "Manufacturing",
+    "manpower": "Manpower",
+    "manpower agency": "Manpower",
+    "placement agency": "Manpower",
+    "placement consultants": "Manpower",
+    "recruitment agency": "Manpower",
+    "staffing agency": "Manpower",
+}
+
+# Once a category has this many leads, sources that came back empty for it don't
+# fall back to browser loads
+FALLBACK_MIN_LEADS = 10
+# Fewer queries in flight when a plan can stop early, so the stop takes effect
+LIMITED_CONCURRENCY = 8
+STATS_ALPHA = 0.3          # Weight of the newest run in the yield/cost averages
+MIN_QUERY_SECONDS = 0.1    # Floor on a query's cost, so cached/instant results don't divide by ~0
+
+Query = collections.namedtuple("Query", "source category pincode")
+
+def category_key(category):
+    return re.sub(r"\s+", " ", category.strip().lower())
+
+def canonical_category(category):
+    """'Call Centre' -> 'BPO'; unknown categories are kept as given."""
+    return CATEGORY_SYNONYMS.get(category_key(category), category.strip())
+
+def load_localities(path):
+    """pincode -> locality from a 'pincode,locality' CSV (header optional)."""
+    localities = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) >= 2 and row[0].strip().isdigit() and row[1].strip():
+                localities[row[0].strip()] = row[1].strip().lower()
+    return localities
+
+class QueryStats(SQLiteStore):
+    """
+    History of what each (source, category) query yields and costs, kept across runs:
+    moving averages of leads found and seconds taken. Thread-safe. A database error
+    reads as no history and skips the update (see SQLiteStore).
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS query_stats (
+            source TEXT NOT NULL,
+            category TEXT NOT NULL,
+            runs INTEGER NOT NULL,
+            leads REAL NOT NULL,
+            seconds REAL NOT NULL,
+            updated REAL NOT NULL,
+            PRIMARY KEY (source, category)
+        );
+    """
+    TABLES = ("query_stats",)
+
+    def __init__(self, path=DEFAULT_STATS_PATH):
+        super().__init__(path)
+
+    def get(self, source, category):
+        """(avg leads, avg seconds) of past runs, or None if the query never ran."""
+        row = self.fetchone(
+            "SELECT leads, seconds FROM query_stats WHERE source = ? AND category = ?",
+            (source, category_key(category))
+        )
+        return tuple(row) if row else None
+
+    def record(self, source, category, leads, seconds):
+        key = category_key(category)
+
+        def update(conn):
+            row = conn.execute(
+                "SELECT runs, leads, seconds FROM query_stats WHERE source = ? AND category = ?",
+                (source, key)
+            ).fetchone()
+            if row:
+                runs = row[0] + 1
+                avg_leads = (1 - STATS_ALPHA) * row[1] + STATS_ALPHA * leads
+                avg_seconds = (1 - STATS_ALPHA) * row[2] + STATS_ALPHA * seconds
+            else:
+                runs, avg_leads, avg_seconds = 1, leads, seconds
+            conn.execute(
+                "INSERT OR REPLACE INTO query_stats (source, category, runs, leads, seconds, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (source, key, runs, avg_leads, avg_seconds, time.time())
+            )
+
+        self.run(update)
+
+    def stats(self):
+        """{'source.category': {runs, leads, seconds, yield_per_second}}"""
+        rows = self.fetchall(
+            "SELECT source, category, runs, leads, seconds FROM query_stats ORDER BY source, category"
+        )
+        return {
+            f"{source}.{category}": {
+                "runs": runs, "leads": round(leads, 1), "seconds": round(seconds, 2),
+                "yield_per_second": round(leads / max(seconds, MIN_QUERY_SECONDS), 2),
+            }
+            for source, category, runs, leads, seconds in rows
+        }
+
+class QueryPlan:
+    """
+    Ordered queries for one search, consumed with next_query() and fed back with record().
+    next_query() returns None once the queries run out, `target_leads` distinct leads were
+    found, or the seconds spent on queries reach `budget` (queries in flight still finish).
+    """
+    def __init__(self, queries, target_leads=None, budget=None, stats=None):
+        self.queries = collections.deque(queries)
+        self.target_leads = target_leads or None
+        self.budget = budget or None
+        self.stats = stats
+        self.spent = 0.0
+        self.stop_reason = None
+        self._mobiles = set()
+        self._unkeyed = 0
+        self._category_leads = collections.Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def limited(self):
+        """True if the plan may stop before running every query."""
+        return self.target_leads is not None or self.budget is not None
+
+    @property
+    def leads(self):
+        """Distinct leads found so far (by mobile)."""
+        return len(self._mobiles) + self._unkeyed
+
+    def next_query(self):
+        with self._lock:
+            if self.stop_reason is None:
+                if self.target_leads is not None and self.leads >= self.target_leads:
+                    self.stop_reason = "target"
+                elif self.budget is not None and self.spent >= self.budget:
+                    self.stop_reason = "budget"
+            if self.stop_reason is not None or not self.queries:
+                return None
+            return self.queries.popleft()
+
+    def record(self, query, leads, seconds=None):
+        """
+        Feeds back a finished query, towards the target and budget. `seconds` is None for
+        results replayed from the journal: they count towards the target but cost nothing.
+        In memory only; the yield history is updated separately by record_history().
+        """
+        leads = leads or []
+        with self._lock:
+            for lead in leads:
+                if lead.get("Mobile"):
+                    self._mobiles.add(lead["Mobile"])
+                else:
+                    self._unkeyed += 1
+            self._category_leads[category_key(query.category)] += len(leads)
+            if seconds is not None:
+                self.spent += seconds
+
+    def record_history(self, query, leads, seconds):
+        """Adds a query that was actually run to the yield history (QueryStats)."""
+        if self.stats is not None:
+            self.stats.record(query.source, query.category, len(leads or []), seconds)
+
+    def wants_fallback(self, category):
+        """False once other queries already found enough leads for `category`."""
+        with self._lock:
+            return self._category_leads[category_key(category)] < FALLBACK_MIN_LEADS
+
+    def skipped(self):
+        """Queries left unrun."""
+        with self._lock:
+            return len(self.queries)
+
+class QueryPlanner:
+    """
+    Builds the discovery queries for a search up front:
+    - synonymous categories collapse into one query (CATEGORY_SYNONYMS);
+    - pincodes sharing a locality (`localities`, pincode -> name) are searched once, under
+      the first of them;
+    - queries are ordered by historical leads per second, never-run queries first.
+    """
+    def __init__(self, sources=PLANNER_SOURCES, stats=None, localities=None):
+        self.sources = tuple(sources)
+        self.stats = stats
+        self.localities = localities or {}
+
+    def priority(self, query):
+        history = self.stats.get(query.source, query.category) if self.stats is not None else None
+        if history is None:
+            return float("inf")  # Unmeasured: run it so it gets measured
+        leads, seconds = history
+        return leads / max(seconds, MIN_QUERY_SECONDS)
+
+    def queries(self, pincodes, categories):
+        """
+        {pincode: [Query]} in priority order. A pincode whose locality was already covered by
+        an earlier one gets no queries; duplicate categories are dropped.
+        """
+        categories = list(dict.fromkeys(canonical_category(c) for c in categories))
+        seen = set()
+        out = {}
+        for pincode in pincodes:
+            area = self.localities.get(pincode, pincode)
+            planned = []
+            for category in categories:
+                for source in self.sources:
+                    key = (source, category_key(category), area)
+                    if key not in seen:
+                        seen.add(key)
+                        planned.append(Query(source, category, pincode))
+            # Stable sort: ties keep category/source order
+            out[pincode] = sorted(planned, key=self.priority, reverse=True)
+        return out
+
+    def plan(self, pincode, categories, target_leads=None, budget=None, queries=None):
+        """QueryPlan for one pincode (`queries` overrides the ones planned here)."""
+        if queries is None:
+            queries = self.queries([pincode], categories)[pincode]
+        return QueryPlan(queries, target_leads, budget, self.stats)
+
+
+_planner = None
+_planner_lock = threading.Lock()
+
+def get_query_planner():
+    """
+    Returns the process-wide QueryPlanner, creating it on first use.
+    QUERY_STATS=0 turns off the yield history; PINCODE_LOCALITIES names a
+    'pincode,locality' CSV used to collapse neighbouring pincodes.
+    """
+    global _planner
+    with _planner_lock:
+        if _planner is None:
+            stats = QueryStats() if os.environ.get("QUERY_STATS", "1") != "0" else None
+            localities = None
+            if os.environ.get("PINCODE_LOCALITIES"):
+                localities = load_localities(os.environ["PINCODE_LOCALITIES"])
+            _planner = QueryPlanner(stats=stats, localities=localities)
+        return _planner
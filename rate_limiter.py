@@ -0,0 +1,227 @@
+import asyncio
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Per-host limits:
+# rate/burst = token bucket (requests per second / bucket size)
+# initial_limit/min_limit/max_limit = AIMD concurrency window
+HOST_LIMITS = {
+    "google.serper.dev": {"rate": 50.0, "burst": 50, "initial_limit": 16, "min_limit": 2, "max_limit": 64},
+    "dir.indiamart.com": {"rate": 2.0, "burst": 4, "initial_limit": 4, "min_limit": 1, "max_limit": 8},
+    "www.justdial.com": {"rate": 1.0, "burst": 2, "initial_limit": 2, "min_limit": 1, "max_limit": 4},
+    "www.sulekha.com": {"rate": 1.0, "burst": 2, "initial_limit": 2, "min_limit": 1, "max_limit": 4},
+}
+DEFAULT_HOST_LIMIT = {"rate": 5.0, "burst": 5, "initial_limit": 4, "min_limit": 1, "max_limit": 16}
+
+DECREASE_FACTOR = 0.5     # Multiplicative decrease on 429 / 5xx / timeout
+DECREASE_COOLDOWN = 1.0   # Seconds; one burst of failures only halves the window once
+DEFAULT_RETRY_AFTER = 5.0 # Seconds to pause a host after a 429 without Retry-After
+BUSY_POLL = 0.05          # Seconds between checks while the window is full
+
+# Request outcomes
+OK = "ok"
+THROTTLED = "throttled"
+ERROR = "error"
+TIMEOUT = "timeout"
+CANCELLED = "cancelled"  # Caller gave up (early stop, closed stream): says nothing about the host
+
+def classify(status=None, exc=None):
+    """Maps an HTTP status or exception to an outcome for HostLimiter.release()."""
+    if isinstance(exc, asyncio.CancelledError):
+        return CANCELLED
+    if exc is not None:
+        name = type(exc).__name__.lower()
+        return TIMEOUT if "timeout" in name else ERROR
+    if status == 429:
+        return THROTTLED
+    if status is not None and status >= 500:
+        return ERROR
+    return OK
+
+def parse_retry_after(value):
+    """Retry-After header (seconds or HTTP date) to seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class HostLimiter:
+    """
+    Token bucket plus AIMD concurrency window for one host.
+    - Each request takes a token (refilled at `rate` per second, up to `burst`).
+    - At most floor(window) requests are in flight. The window grows by 1/window per success
+      and halves on 429 / 5xx / timeout (at most once per DECREASE_COOLDOWN). Cancelled
+      requests free their slot without touching the window.
+    - A 429 pauses the host for Retry-After seconds.
+    Thread-safe; usable from threads (acquire) and event loops (acquire_async).
+    """
+    def __init__(self, host, rate, burst, initial_limit, min_limit, max_limit):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(initial_limit)
+
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._counts = {OK: 0, THROTTLED: 0, ERROR: 0, TIMEOUT: 0, CANCELLED: 0}
+
+    def _try_acquire(self):
+        """Takes a slot and returns 0, or returns how long to wait before trying again."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._in_flight >= int(self.limit):
+                return BUSY_POLL
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+            self._in_flight += 1
+            return 0
+
+    def acquire(self):
+        while True:
+            wait = self._try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while True:
+            wait = self._try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, outcome=OK, retry_after=None):
+        with self._lock:
+            self._in_flight -= 1
+            self._counts[outcome] = self._counts.get(outcome, 0) + 1
+            now = time.monotonic()
+            if outcome == OK:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                return
+            if outcome == CANCELLED:
+                return
+            if now - self._last_decrease >= DECREASE_COOLDOWN:
+                self.limit = max(self.min_limit, self.limit * DECREASE_FACTOR)
+                self._last_decrease = now
+            if outcome == THROTTLED:
+                pause = retry_after if retry_after is not None else DEFAULT_RETRY_AFTER
+                self._blocked_until = max(self._blocked_until, now + pause)
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._counts)
+            out["limit"] = round(self.limit, 2)
+            out["in_flight"] = self._in_flight
+            out["paused_for"] = round(max(0.0, self._blocked_until - time.monotonic()), 2)
+            return out
+
+class _Slot:
+    """Holds one HostLimiter slot; call report() with the outcome before leaving the block."""
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self.outcome = OK
+        self.retry_after = None
+
+    def report(self, status=None, exc=None, retry_after=None, outcome=None):
+        self.outcome = outcome or classify(status, exc)
+        self.retry_after = parse_retry_after(retry_after) if isinstance(retry_after, str) else retry_after
+
+    def __enter__(self):
+        self.limiter.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None and self.outcome == OK:
+            self.outcome = classify(exc=exc)
+        self.limiter.release(self.outcome, self.retry_after)
+
+    async def __aenter__(self):
+        await self.limiter.acquire_async()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.__exit__(exc_type, exc, tb)
+
+def share_limit(config, processes):
+    """A host limit split evenly between `processes` that each enforce their own copy."""
+    if processes <= 1:
+        return config
+    return {
+        "rate": config["rate"] / processes,
+        "burst": max(1, config["burst"] / processes),
+        "initial_limit": max(1, config["initial_limit"] // processes),
+        "min_limit": max(1, config["min_limit"] // processes),
+        "max_limit": max(1, config["max_limit"] // processes),
+    }
+
+class RateLimiter:
+    """
+    Registry of HostLimiters, one per host, shared by every outbound request path.
+    Limits are per process: with `processes` > 1 (CLI workers) each host's limits are
+    divided between them, so the sweep as a whole stays within HOST_LIMITS.
+    """
+    def __init__(self, host_limits=None, default_limit=None, processes=1):
+        self.host_limits = dict(HOST_LIMITS)
+        if host_limits:
+            self.host_limits.update(host_limits)
+        self.default_limit = default_limit or DEFAULT_HOST_LIMIT
+        self.processes = processes
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def for_host(self, host):
+        with self._lock:
+            limiter = self._hosts.get(host)
+            if limiter is None:
+                config = share_limit(self.host_limits.get(host, self.default_limit), self.processes)
+                limiter = self._hosts[host] = HostLimiter(host, **config)
+            return limiter
+
+    def slot(self, url):
+        """
+        Context manager (sync or async) around one request to `url`:
+            with limiter.slot(url) as slot:
+                resp = requests.get(url)
+                slot.report(resp.status_code, retry_after=resp.headers.get("Retry-After"))
+        """
+        return _Slot(self.for_host(urlsplit(url).hostname or ""))
+
+    def stats(self):
+        with self._lock:
+            hosts = list(self._hosts.values())
+        return {h.host: h.stats() for h in hosts}
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    """
+    Returns the process-wide RateLimiter, creating it on first use.
+    RATE_LIMIT_PROCESSES is the number of processes sharing the host limits (set by cli.py).
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(processes=int(os.environ.get("RATE_LIMIT_PROCESSES", "1")))
+        return _limiter
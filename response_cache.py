@@ -0,0 +1,111 @@
+import hashlib
+import json
+import time
+from sqlite_store import SQLiteStore, cache_path
+
+DEFAULT_CACHE_PATH = cache_path("serper_responses.sqlite3")
+
+# Time-to-live per Serper endpoint (seconds)
+DEFAULT_TTLS = {
+    "search": 7 * 24 * 3600,
+    "places": 3 * 24 * 3600,
+}
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 50000
+EVICT_EVERY = 200  # Check the size bound once every N writes
+
+def cache_key(endpoint, payload):
+    """Stable key for an endpoint + payload (dict key order and whitespace don't matter)."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{endpoint}\n{canonical}".encode("utf-8")).hexdigest()
+
+class ResponseCache(SQLiteStore):
+    """
+    Persistent SQLite cache for JSON API responses.
+    - Entries expire after a per-endpoint TTL.
+    - Size is bounded to `max_entries`, evicting least recently used rows.
+    - Thread-safe and shareable between processes (CLI workers). Database errors count as
+      misses / skipped writes (see SQLiteStore), never fail the call.
+    - Hit/miss/write/eviction/error counters via stats().
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            endpoint TEXT NOT NULL,
+            body TEXT NOT NULL,
+            created REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access);
+    """
+    TABLES = ("responses",)
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None, max_entries=DEFAULT_MAX_ENTRIES):
+        super().__init__(path)
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_entries = max_entries
+        self._writes_since_evict = 0
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def ttl_for(self, endpoint):
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+
+    def get(self, endpoint, payload):
+        """Returns the cached response, or None on miss/expiry/database error."""
+        key = cache_key(endpoint, payload)
+        now = time.time()
+
+        def lookup(conn):
+            row = conn.execute("SELECT body, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_for(endpoint):
+                if row is not None:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            return row[0]
+
+        body = self.run(lookup)
+        with self._lock:
+            self._stats["hits" if body is not None else "misses"] += 1
+        return json.loads(body) if body is not None else None
+
+    def set(self, endpoint, payload, response):
+        key = cache_key(endpoint, payload)
+        now = time.time()
+        body = json.dumps(response, ensure_ascii=False)
+
+        def store(conn):
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, body, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint, body, now, now)
+            )
+            self._stats["writes"] += 1
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= EVICT_EVERY:
+                self._evict(conn)
+
+        self.run(store)
+
+    def _evict(self, conn):
+        # Caller holds the lock
+        self._writes_since_evict = 0
+        count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                (excess,)
+            )
+            self._stats["evictions"] += excess
+
+    def stats(self):
+        row = self.fetchone("SELECT COUNT(*) FROM responses")
+        with self._lock:
+            out = dict(self._stats)
+            out["errors"] = self.errors
+        out["entries"] = row[0] if row else None
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = out["hits"] / lookups if lookups else 0.0
+        return out
@@ -1,11 +1,33 @@
+import asyncio
+import atexit
+import multiprocessing
+import os
+import aiohttp
 import requests
 from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 import re
-import json
-import random
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from playwright.sync_api import sync_playwright
+import queue
+import threading
+import pandas as pd
+from urllib.parse import urlsplit
+try:
+    import pyarrow  # Optional: Arrow-backed strings make normalize_mobiles much faster
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    STRING_DTYPE = object
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from browser_pool import get_browser_pool
+from serper_client import get_serper_client
+from rate_limiter import get_rate_limiter, TIMEOUT
+from dedup import EntityIndex
+from leads import Lead
+from metrics import get_metrics
+from source_strategy import get_source_strategy, classify_fetch, OK, EMPTY, ERROR
+from query_planner import get_query_planner, LIMITED_CONCURRENCY
 
 # Common Headers
 HEADERS = {
@@ -18,12 +40,80 @@ HEADERS = {
     'Upgrade-Insecure-Requests': '1',
 }
 
+# Default business categories searched per pincode
+CATEGORIES = ["BPO", "Corporate House", "Hospital", "Manufacturing", "Manpower"]
+
+# Phone patterns (Mobile or Landline, then bare digit runs as fallback)
+PHONE_PATTERN = re.compile(r'(?:\+91|0)?\s?\d{2,5}[\s-]?\d{6,8}')
+DIGITS_PATTERN = re.compile(r'\b\d{8,12}\b')
+NON_DIGIT_PATTERN = re.compile(r'\D')
+NON_ASCII_PATTERN = re.compile(r'[^\x00-\x7f]')
+
+# Below this many numbers, normalize_mobiles() loops in Python (pandas setup costs more)
+VECTORIZE_MIN_BATCH = 64
+
+# Playwright page loads
+NAVIGATION_TIMEOUT_MS = 20000
+SCROLL_SETTLE_MS = 1500    # Max wait for lazy-loaded listings to start appearing after a scroll
+CLICK_SETTLE_MS = 1000     # Max wait for numbers to appear after clicking contact buttons
+DOM_QUIET_MS = 250         # The page counts as settled after this long without DOM changes
+SETTLE_MAX_MS = 3000       # Hard cap on any settle wait (pages with animations never go quiet)
+CONTACT_BUTTON_SELECTOR = '.callbutton, .contact-number, .pnm, .duet'
+# Never needed for extraction
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font', 'stylesheet', 'beacon', 'ping', 'imageset', 'texttrack'}
+# Analytics/ads hosts (other third parties stay allowed: the listing sites serve their app JS from CDNs)
+BLOCKED_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'googleadservices.com', 'adservice.google.', 'facebook.net', 'facebook.com', 'connect.facebook',
+    'hotjar.com', 'clarity.ms', 'scorecardresearch.com', 'criteo.', 'taboola.com', 'outbrain.com',
+    'moengage.com', 'webengage.com', 'clevertap', 'newrelic.com', 'nr-data.net', 'branch.io',
+)
+
+# Directory sources. Fetch methods are listed cheapest first: "proxy" (Serper site: search,
+# needs an API key), "http" (plain GET) and "browser" (Playwright). An empty result moves on
+# to the next method only with fallback_on_empty; errors and block pages always do.
+SOURCES = {
+    "justdial": {
+        "name": "Justdial",
+        "domain": "justdial.com",
+        "url": "https://www.justdial.com/India/Search?q={category}&location={pincode}",
+        "methods": ("proxy", "browser"),
+        "fallback_on_empty": False,  # Direct loads are blocked far more often than not
+    },
+    "indiamart": {
+        "name": "IndiaMART",
+        "domain": "indiamart.com",
+        "url": "https://dir.indiamart.com/search.mp?ss={category}&cq={pincode}",
+        "methods": ("proxy", "http", "browser"),
+        "fallback_on_empty": True,
+    },
+    "sulekha": {
+        "name": "Sulekha",
+        "domain": "sulekha.com",
+        "url": "https://www.sulekha.com/search/local?q={category}&location={pincode}",
+        "methods": ("proxy", "browser"),
+        "fallback_on_empty": True,
+    },
+}
+HTTP_TIMEOUT = 10
+
+# Fuzzy extraction settings
+CARD_TAGS = {'div', 'li', 'article', 'tr'}
+NAME_TAGS = ('h1', 'h2', 'h3', 'h4', 'a')
+BOLD_TAGS = ('b', 'strong')
+# get_text() skips strings inside these tags, so the lxml engine does too
+SKIP_TEXT_TAGS = {'script', 'style', 'template', 'rt', 'rp'}
+MIN_CARD_TEXT = 20
+MAX_CARD_TEXT = 1000
+# Smaller pages parse faster inline than the round trip to the parse pool costs
+PARSE_POOL_MIN_CHARS = 64 * 1024
+
 def clean_phone(phone):
     """Clean phone number string."""
     if not phone:
         return None
     # Remove all non-digit characters
-    clean = re.sub(r'\D', '', str(phone))
+    clean = NON_DIGIT_PATTERN.sub('', str(phone))
     return clean
 
 def is_valid_mobile_string(phone_str):
@@ -60,45 +150,364 @@ def is_valid_mobile_string(phone_str):
         
     return clean
 
+def normalize_mobiles(phones):
+    """
+    Batch version of is_valid_mobile_string.
+    Takes a list or pandas Series of raw phone strings and returns the normalized
+    numbers (None where invalid) as a list, or as a Series with the same index.
+    Same rules: +91 stripping, '01' landline rejection, '0' prefix stripping for mobiles.
+    Non-ASCII input goes through is_valid_mobile_string itself: the vectorized regex only
+    knows ASCII digits, while Python's \\D keeps other scripts' digits (e.g. Devanagari).
+    """
+    is_series = isinstance(phones, pd.Series)
+    if not is_series and len(phones) < VECTORIZE_MIN_BATCH:
+        return [is_valid_mobile_string(p) for p in phones]
+
+    raw = phones if is_series else pd.Series(list(phones), dtype=object)
+    missing = (raw.isna() | ~raw.astype(bool)).to_numpy()
+    text = raw.where(~missing, "").astype(str).astype(STRING_DTYPE)
+    digits = text.str.replace(NON_DIGIT_PATTERN.pattern, '', regex=True)
+
+    # Handle +91
+    plus91 = digits.str.startswith('91') & (digits.str.len() > 10)
+    digits = digits.where(~plus91, digits.str.slice(2))
+
+    # Rule 1: Landlines starting with '01'
+    landline = digits.str.startswith('01')
+
+    # Rule 2: '0' + 10-digit mobile starting 6-9
+    stripped = digits.str.slice(1)
+    zero_mobile = digits.str.startswith('0') & (stripped.str.len() == 10) & stripped.str.slice(0, 1).isin(['6', '7', '8', '9'])
+
+    length = digits.str.len()
+    result = digits.where((length >= 8) & (length <= 13))
+    result = result.where(~zero_mobile, stripped)
+    result = result.where(~(landline | missing | (digits == '')))
+    result = result.astype(object).where(result.notna(), None)
+
+    non_ascii = text.str.contains(NON_ASCII_PATTERN.pattern, regex=True).fillna(False).astype(bool).to_numpy()
+    if non_ascii.any():
+        result[non_ascii] = [is_valid_mobile_string(p) for p in raw[non_ascii]]
+
+    return result if is_series else result.tolist()
+
+def first_valid_mobiles(phone_groups):
+    """
+    For each list of candidate phone strings, the first one that validates (or None).
+    All candidates are normalized in a single normalize_mobiles() batch.
+    """
+    flat = [p for group in phone_groups for p in group]
+    normalized = iter(normalize_mobiles(flat))
+    out = []
+    for group in phone_groups:
+        found = None
+        for _ in group:
+            clean = next(normalized)
+            if found is None and clean:
+                found = clean
+        out.append(found)
+    return out
+
+def find_phone_candidates(text):
+    """Phone-like substrings in text (Mobile/Landline pattern, then bare digit runs)."""
+    phones = PHONE_PATTERN.findall(text)
+    if not phones:
+        phones = DIGITS_PATTERN.findall(text)
+    return phones
+
+async def _route_request(route):
+    """Aborts requests for resources the extractor never looks at."""
+    request = route.request
+    host = urlsplit(request.url).hostname or ""
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(h in host for h in BLOCKED_HOSTS):
+        get_metrics().incr("playwright.blocked_requests")
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def _settle(page, action, first_ms, quiet_ms=DOM_QUIET_MS, max_ms=SETTLE_MAX_MS):
+    """
+    Runs `action` (a JS expression) in the page, then waits until the DOM reacts and goes
+    quiet: up to `first_ms` for the first mutation, then until `quiet_ms` pass without one,
+    never longer than `max_ms` in total. Replaces fixed sleeps, so ready pages return early.
+    """
+    await page.evaluate("""([firstMs, quietMs, maxMs]) => new Promise(resolve => {
+        let timer = null, cap = null;
+        const done = () => { observer.disconnect(); clearTimeout(timer); clearTimeout(cap); resolve(); };
+        const observer = new MutationObserver(() => {
+            clearTimeout(timer);
+            timer = setTimeout(done, quietMs);
+        });
+        observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+        (%s);
+        timer = setTimeout(done, firstMs);
+        cap = setTimeout(done, maxMs);
+    })""" % action, [first_ms, quiet_ms, max_ms])
+
+async def _render_listing(page, url):
+    """
+    Loads a listing page on a pooled Playwright page with auto-scroll.
+    Images, fonts, stylesheets and trackers are blocked; waits end as soon as the
+    page stops changing instead of sleeping a fixed time.
+    Returns (html, status); status is None if navigation timed out. Other navigation
+    errors (DNS, refused connection) raise, so they count as errors, not blocks.
+    """
+    await page.route("**/*", _route_request)
+
+    # Go to URL
+    status = None
+    try:
+        response = await page.goto(url, wait_until="domcontentloaded", timeout=NAVIGATION_TIMEOUT_MS)
+        status = response.status if response else 200
+    except PlaywrightTimeoutError:
+        pass # Continue even if timeout, page might have loaded enough
+        
+    # Scroll to trigger lazy loading, then wait for new listings to settle
+    try:
+        await _settle(page, "window.scrollTo(0, document.body.scrollHeight)", SCROLL_SETTLE_MS)
+    except Exception as e:
+        get_metrics().record_exception("playwright.scroll", e)
+    
+    # Extract Contact Numbers (Click 'Show Number' buttons if found)
+    # Justdial specific; only waits for the numbers if there was something to click
+    try:
+        if await page.locator(CONTACT_BUTTON_SELECTOR).count():
+            await _settle(page, f"document.querySelectorAll('{CONTACT_BUTTON_SELECTOR}').forEach(b => b.click())", CLICK_SETTLE_MS)
+    except Exception as e:
+        get_metrics().record_exception("playwright.contact_click", e)
+
+    return await page.content(), status
+
+def _report_render(slot, status):
+    if status is None:
+        slot.report(outcome=TIMEOUT)
+    else:
+        slot.report(status)
+
+def _fetch_playwright(url):
+    """(html, status) from the shared browser pool; raises on browser errors."""
+    with get_rate_limiter().slot(url) as slot, get_metrics().timer("fetch.playwright"):
+        content, status = get_browser_pool(HEADERS['User-Agent']).fetch(url, _render_listing)
+        _report_render(slot, status)
+    get_metrics().incr("bytes.pages", len(content or ""))
+    return content, status
+
+def _fetch_http(url):
+    """(html, status) from a plain rate-limited GET."""
+    with get_rate_limiter().slot(url) as slot:
+        resp = requests.get(url, headers=HEADERS, timeout=HTTP_TIMEOUT)
+        slot.report(resp.status_code, retry_after=resp.headers.get("Retry-After"))
+    get_metrics().incr("bytes.pages", len(resp.content))
+    return resp.text, resp.status_code
+
 def fetch_content_playwright(url):
-    """Robust fetch using Playwright with auto-scroll."""
+    """Robust fetch using the shared Playwright browser pool with auto-scroll."""
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(user_agent=HEADERS['User-Agent'])
-            page = context.new_page()
-            
-            # Go to URL
-            try:
-                page.goto(url, wait_until="domcontentloaded", timeout=45000)
-            except:
-                pass # Continue even if timeout, page might have loaded enough
-                
-            # Scroll to trigger lazy loading
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            page.wait_for_timeout(2000)
-            
-            # Extract Contact Numbers (Click 'Show Number' buttons if found)
-            # Justdial specific
-            try:
-                page.evaluate("""
-                    document.querySelectorAll('.callbutton, .contact-number, .pnm, .duet').forEach(b => b.click());
-                """)
-                page.wait_for_timeout(1000)
-            except:
-                pass
-
-            content = page.content()
-            browser.close()
-            return content
+        return _fetch_playwright(url)[0]
     except Exception as e:
+        get_metrics().record_exception("playwright", e)
         print(f"Playwright error: {e}")
         return None
 
+def _strip_join(el, sep):
+    """lxml equivalent of bs4 get_text(sep, strip=True) on a single element."""
+    parts = []
+    def walk(node):
+        if node.text:
+            t = node.text.strip()
+            if t:
+                parts.append(t)
+        for child in node:
+            if isinstance(child.tag, str) and child.tag not in SKIP_TEXT_TAGS:
+                walk(child)
+            if child.tail:
+                t = child.tail.strip()
+                if t:
+                    parts.append(t)
+    walk(el)
+    return sep.join(parts)
+
+def _first_named(card, tags):
+    for el in card.iter(*tags):
+        if el is not card:
+            return el
+    return None
+
+def _parse_html_tree(html):
+    if not html:
+        return None
+    try:
+        return lxml_html.document_fromstring(html)
+    except ValueError:
+        # Unicode strings with an encoding declaration must be passed as bytes
+        return lxml_html.document_fromstring(html.encode('utf-8'))
+    except etree.ParserError:
+        return None
+
 def extract_from_html_fuzzy(html, source_name, category):
     """
     Scrapes companies using heuristic patterns (Heading + Phone proximity).
     Useful when CSS classes change.
+    
+    Single pass over an lxml tree: block text is built bottom-up from child text
+    (capped at MAX_CARD_TEXT, so oversized ancestors are never serialized) and phone
+    detection runs once per distinct block text, so wrapper divs reuse the result of
+    the smallest block with the same text.
+    Produces the same records as extract_from_html_fuzzy_soup.
+    """
+    results = []
+    root = _parse_html_tree(html)
+    if root is None:
+        return results
+
+    # 1. Bottom-up block text. None means "longer than MAX_CARD_TEXT".
+    texts = {}
+    card_texts = {}
+    for _, el in etree.iterwalk(root, events=("end",)):
+        tag = el.tag
+        if not isinstance(tag, str) or tag in SKIP_TEXT_TAGS:
+            continue
+        parts = []
+        size = 0
+        overflow = False
+        if el.text:
+            t = el.text.strip()
+            if t:
+                parts.append(t)
+                size += len(t) + 1
+        for child in el:
+            if isinstance(child.tag, str) and child.tag not in SKIP_TEXT_TAGS:
+                child_text = texts.pop(child, "")
+                if child_text is None:
+                    overflow = True
+                elif child_text:
+                    parts.append(child_text)
+                    size += len(child_text) + 1
+            if child.tail:
+                t = child.tail.strip()
+                if t:
+                    parts.append(t)
+                    size += len(t) + 1
+            if overflow or size > MAX_CARD_TEXT + 1:
+                overflow = True
+                break
+        text = None if overflow or size > MAX_CARD_TEXT + 1 else " ".join(parts)
+        texts[el] = text
+        if tag in CARD_TAGS:
+            card_texts[el] = text
+
+    # 2. Cards in document order (iterwalk "end" events are post-order)
+    cards = []
+    for card in root.iter(*CARD_TAGS):
+        text = card_texts.get(card)
+        if text is None or len(text) < MIN_CARD_TEXT: # Filter too small/big blocks
+            continue
+        cards.append((card, text))
+
+    # 3. Phone detection once per distinct block text, validated in one batch
+    unique_texts = list(dict.fromkeys(text for _, text in cards))
+    mobiles = first_valid_mobiles([find_phone_candidates(t) for t in unique_texts])
+    mobile_by_text = dict(zip(unique_texts, mobiles))
+
+    seen_mobiles = set()
+    
+    for card, text in cards:
+        valid_mobile = mobile_by_text[text]
+        
+        if valid_mobile and valid_mobile not in seen_mobiles:
+            name = None
+            
+            # Strategy A: Heading tag
+            head = _first_named(card, NAME_TAGS)
+            if head is not None:
+                name = _strip_join(head, "")
+                
+            # Strategy B: First bold text
+            if not name:
+                bold = _first_named(card, BOLD_TAGS)
+                if bold is not None:
+                    name = _strip_join(bold, "")
+            
+            if name and len(name) > 3 and "search" not in name.lower():
+                seen_mobiles.add(valid_mobile)
+                results.append(Lead({
+                    "Company": name,
+                    "Category": category,
+                    "Mobile": valid_mobile,
+                    "Source": source_name,
+                    "Raw_Phone": valid_mobile
+                }))
+                
+    return results
+
+def _extract_lead_tuples(html_bytes, source_name, category):
+    """Parse-pool worker: raw page bytes -> compact (company, mobile) tuples."""
+    leads = extract_from_html_fuzzy(html_bytes.decode("utf-8"), source_name, category)
+    return [(lead["Company"], lead["Mobile"]) for lead in leads]
+
+def _leads_from_tuples(tuples, source_name, category):
+    """Rebuilds extract_from_html_fuzzy records from _extract_lead_tuples output."""
+    return [
+        Lead({"Company": name, "Category": category, "Mobile": mobile, "Source": source_name, "Raw_Phone": mobile})
+        for name, mobile in tuples
+    ]
+
+def _init_parse_worker():
+    # Warm the parser (lxml, regexes, pandas) before the first real page arrives
+    extract_from_html_fuzzy("<div><h3>Warm Up Ltd</h3> Call 9876543210 today</div>", "", "")
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+def get_parse_pool():
+    """
+    Returns the process-wide HTML parse pool, creating it on first use, or None when
+    PARSE_PROCESSES=0 (parse in threads). PARSE_PROCESSES sets the worker count
+    (default: one per core).
+    """
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            workers = int(os.environ.get("PARSE_PROCESSES", os.cpu_count() or 1))
+            if workers <= 0:
+                return None
+            # spawn: forking a process full of threads (Streamlit, aiohttp, the browser pool) is unsafe
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_parse_worker
+            )
+            atexit.register(_parse_pool.shutdown, wait=False, cancel_futures=True)
+        return _parse_pool
+
+def _reset_parse_pool(pool):
+    """Drops a broken pool so the next page gets a fresh one."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def parse_listing(html, source_name, category):
+    """
+    extract_from_html_fuzzy off the calling thread's GIL: pages of PARSE_POOL_MIN_CHARS
+    or more are parsed in the process pool, smaller ones inline.
+    """
+    pool = get_parse_pool() if len(html) >= PARSE_POOL_MIN_CHARS else None
+    if pool is None:
+        return extract_from_html_fuzzy(html, source_name, category)
+    try:
+        tuples = pool.submit(_extract_lead_tuples, html.encode("utf-8"), source_name, category).result()
+    except BrokenProcessPool as e:
+        get_metrics().record_exception("parse_pool", e)
+        _reset_parse_pool(pool)
+        return extract_from_html_fuzzy(html, source_name, category)
+    return _leads_from_tuples(tuples, source_name, category)
+
+def extract_from_html_fuzzy_soup(html, source_name, category):
+    """
+    Original BeautifulSoup implementation of extract_from_html_fuzzy.
+    Quadratic on deeply nested pages; kept as the reference for parity checks.
     """
     results = []
     soup = BeautifulSoup(html, 'html.parser')
@@ -143,213 +552,582 @@ def extract_from_html_fuzzy(html, source_name, category):
             
             if name and len(name) > 3 and "search" not in name.lower():
                 seen_mobiles.add(valid_mobile)
-                results.append({
+                results.append(Lead({
                     "Company": name,
                     "Category": category,
                     "Mobile": valid_mobile,
                     "Source": source_name,
                     "Raw_Phone": valid_mobile
-                })
+                }))
                 
     return results
 
-def google_proxy_search(category, pincode, source_domain, api_key):
+# Async engine limits
+ASYNC_CONCURRENCY = 32      # Source tasks (API calls + page loads) in flight at once
+ASYNC_HTTP_TIMEOUT = 30     # Seconds per HTTP request
+
+# Result pagination (Serper search and places)
+MAX_PAGES = 6               # Hard cap on pages per query
+MIN_NEW_PER_PAGE = 3        # A round of pages must add this many new mobiles per page to go on
+MAX_DUPLICATE_SHARE = 0.6   # ...and less than this share of its mobiles may be repeats
+PROXY_FIRST_PAGES = 1       # One 100-result page already shows whether a site: query is sparse
+PLACES_FIRST_PAGES = 2
+
+def _proxy_search_payload(category, pincode, source_domain, page=1):
     """
-    Uses Google (Serper) to find pages on the target site when direct scraping is blocked.
-    Query: site:justdial.com "Category" "Pincode"
+    Google (Serper) search for pages on the target site, for when direct scraping is blocked.
+    Query: site:justdial.com Category Pincode
     """
-    url = "https://google.serper.dev/search"
-    query = f"site:{source_domain} {category} {pincode}"
-    
-    payload = json.dumps({
-        "q": query,
+    payload = {
+        "q": f"site:{source_domain} {category} {pincode}",
         "gl": "in",
-        "num": 100 # Fetch 100 results per source
-    })
-    headers = {
-        'X-API-KEY': api_key,
-        'Content-Type': 'application/json'
+        "num": 100 # Fetch 100 results per page
     }
-    
+    if page > 1:
+        payload["page"] = page  # Page 1 keeps its original payload (and cache key)
+    return payload
+
+def _parse_proxy_results(data, category, source_domain):
+    """Turns a Serper search response into leads for `source_domain`."""
     results = []
-    try:
-        response = requests.request("POST", url, headers=headers, data=payload)
-        data = response.json()
+    if "organic" in data:
+        items = data["organic"]
         
-        if "organic" in data:
-            for item in data["organic"]:
-                title = item.get("title", "")
-                snippet = item.get("snippet", "")
-                link = item.get("link", "")
-                
-                # Combine title and snippet for phone extraction
-                full_text = f"{title} {snippet}"
-                
-                # Extract Phone (Mobile or Landline)
-                phones = re.findall(r'(?:\+91|0)?\s?\d{2,5}[\s-]?\d{6,8}', full_text)
-                if not phones:
-                     phones = re.findall(r'\b\d{8,12}\b', full_text)
-                    
-                valid_mobile = None
-                for p in phones:
-                    clean = is_valid_mobile_string(p)
-                    if clean:
-                        valid_mobile = clean
-                        break
-                
-                # If we found a mobile, Great!
-                # If not, we might still want the link to Deep Scrape it later? 
-                # For now, let's only keep ones with numbers in snippet to be fast (Zero Cost spirit)
-                # Or if the user wants deep research, we can visit the link. 
-                # Let's trust the snippet for now.
-                
-                if valid_mobile:
-                    # Clean Company Name (remove " - Justdial" etc)
-                    clean_name = title.split(" - ")[0].split(" | ")[0]
-                    
-                    results.append({
-                        "Company": clean_name,
-                        "Category": category,
-                        "Mobile": valid_mobile,
-                        "Source": f"{source_domain} (via Google)",
-                        "Raw_Phone": valid_mobile,
-                        "Website": link
-                    })
-    except Exception as e:
-        print(f"Google Proxy Error for {source_domain}: {e}")
+        # Combine title and snippet for phone extraction (Mobile or Landline)
+        texts = [f"{item.get('title', '')} {item.get('snippet', '')}" for item in items]
+        mobiles = first_valid_mobiles([find_phone_candidates(t) for t in texts])
         
+        for item, valid_mobile in zip(items, mobiles):
+            title = item.get("title", "")
+            link = item.get("link", "")
+            
+            # If we found a mobile, Great!
+            # If not, we might still want the link to Deep Scrape it later? 
+            # For now, let's only keep ones with numbers in snippet to be fast (Zero Cost spirit)
+            # Or if the user wants deep research, we can visit the link. 
+            # Let's trust the snippet for now.
+            
+            if valid_mobile:
+                # Clean Company Name (remove " - Justdial" etc)
+                clean_name = title.split(" - ")[0].split(" | ")[0]
+                
+                results.append(Lead({
+                    "Company": clean_name,
+                    "Category": category,
+                    "Mobile": valid_mobile,
+                    "Source": f"{source_domain} (via Google)",
+                    "Raw_Phone": valid_mobile,
+                    "Website": link
+                }))
     return results
 
-def scrape_justdial(category, pincode, api_key=None):
-    """Scrape Justdial."""
-    # 1. Try Google Proxy First (Most reliable for Justdial which blocks brutally)
-    if api_key:
-        return google_proxy_search(category, pincode, "justdial.com", api_key)
-
-    # 2. Fallback to direct (will likely fail but kept for integrity)
-    url = f"https://www.justdial.com/India/Search?q={category}&location={pincode}"
-    content = fetch_content_playwright(url)
-    if content:
-        return extract_from_html_fuzzy(content, "Justdial", category)
-    return []
+def _places_payload(category, pincode, page):
+    return {
+        "q": f"{category} in {pincode}",
+        "location": f"{pincode}, India",
+        "page": page
+    }
 
-def scrape_indiamart(category, pincode, api_key=None):
-    """Scrape IndiaMART."""
-    # 1. Try Google Proxy
+def _parse_places(places, category):
+    """Turns a page of Serper places into leads."""
     results = []
-    if api_key:
-        results = google_proxy_search(category, pincode, "indiamart.com", api_key)
-        if results: return results
+    mobiles = normalize_mobiles([place.get("phoneNumber") for place in places])
+    for place, valid_mobile in zip(places, mobiles):
+        if valid_mobile:
+             results.append(Lead({
+                "Company": place.get("title"),
+                "Category": category,
+                "Mobile": valid_mobile,
+                "Source": "Google Maps",
+                "Raw_Phone": valid_mobile,
+                "Website": place.get("website", "N/A")
+            }))
+    return results
 
-    # 2. Direct Search
-    url = f"https://dir.indiamart.com/search.mp?ss={category}&cq={pincode}"
-    try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
-        if resp.status_code == 200:
-            return extract_from_html_fuzzy(resp.text, "IndiaMART", category)
-    except:
-        pass
-    content = fetch_content_playwright(url)
-    if content:
-        return extract_from_html_fuzzy(content, "IndiaMART", category)
+class Paginator:
+    """
+    Decides how many result pages of one query to fetch.
+    Pages are fetched in rounds, each round concurrently and twice as wide as the last.
+    Paging stops after a round with an empty page or a page of mostly repeats
+    (MAX_DUPLICATE_SHARE), a round adding fewer than MIN_NEW_PER_PAGE new mobiles
+    per page, or at MAX_PAGES.
+    Dense queries go deep; sparse ones stop after the first round.
+    """
+    def __init__(self, first_pages=1, max_pages=MAX_PAGES):
+        self.width = first_pages
+        self.max_pages = max_pages
+        self.next_page = 1
+        self.seen = set()
+        self.leads = []
+        self.stop_reason = None
+
+    def next_round(self):
+        """Page numbers to fetch next, [] once paging has stopped."""
+        if self.stop_reason is not None:
+            return []
+        last = min(self.max_pages, self.next_page + self.width - 1)
+        pages = list(range(self.next_page, last + 1))
+        self.next_page = last + 1
+        self.width *= 2
+        return pages
+
+    def add_round(self, results):
+        """Takes [(result_count, leads)] for the round's pages; returns the leads not seen before."""
+        new = []
+        for count, leads in results:
+            page_new = 0
+            for lead in leads:
+                if lead["Mobile"] not in self.seen:
+                    self.seen.add(lead["Mobile"])
+                    new.append(lead)
+                    page_new += 1
+            if count == 0:
+                self.stop_reason = self.stop_reason or "empty"
+            elif leads and len(leads) - page_new >= MAX_DUPLICATE_SHARE * len(leads):
+                self.stop_reason = self.stop_reason or "duplicates"
+        self.leads.extend(new)
+
+        if self.stop_reason is None:
+            if len(new) < MIN_NEW_PER_PAGE * len(results):
+                self.stop_reason = "low_yield"
+            elif self.next_page > self.max_pages:
+                self.stop_reason = "max_pages"
+        if self.stop_reason is not None:
+            get_metrics().incr(f"pagination.{self.stop_reason}")
+        return new
+
+def _page_results(pages, outcomes):
+    """
+    (result_count, leads) per page from fetch results or exceptions.
+    A failed first page fails the query; later failures just count as empty pages.
+    """
+    results = []
+    for page, outcome in zip(pages, outcomes):
+        if isinstance(outcome, BaseException):
+            if page == 1:
+                raise outcome
+            get_metrics().record_exception("pagination", outcome)
+            outcome = (0, [])
+        results.append(outcome)
+    return results
+
+def paginate(fetch_page, first_pages=1):
+    """
+    Leads from as many pages as pay off (see Paginator). `fetch_page(page)` returns
+    (result_count, leads); each round's pages are fetched on parallel threads.
+    """
+    pager = Paginator(first_pages)
+    pages = pager.next_round()
+    while pages:
+        with ThreadPoolExecutor(max_workers=len(pages)) as executor:
+            futures = [executor.submit(fetch_page, page) for page in pages]
+        outcomes = [f.exception() or f.result() for f in futures]
+        pager.add_round(_page_results(pages, outcomes))
+        pages = pager.next_round()
+    return pager.leads
+
+async def paginate_async(fetch_page, first_pages=1):
+    """Async variant of paginate: `fetch_page(page)` is a coroutine function."""
+    pager = Paginator(first_pages)
+    pages = pager.next_round()
+    while pages:
+        outcomes = await asyncio.gather(*(fetch_page(page) for page in pages), return_exceptions=True)
+        pager.add_round(_page_results(pages, outcomes))
+        pages = pager.next_round()
+    return pager.leads
+
+def _source_methods(source, api_key):
+    return [m for m in SOURCES[source]["methods"] if m != "proxy" or api_key]
+
+def _parseable(html, status):
+    # Timed-out browser loads (status None) may still hold usable content
+    return bool(html) and (status is None or status < 400)
+
+def _fetch_source(source, method, category, pincode, api_key):
+    """One attempt at a source: (leads, status, html); html is None for the proxy."""
+    spec = SOURCES[source]
+    if method == "proxy":
+        def fetch_page(page):
+            data = get_serper_client().search(_proxy_search_payload(category, pincode, spec["domain"], page), api_key)
+            get_metrics().incr("pages.search")
+            return len(data.get("organic", [])), _parse_proxy_results(data, category, spec["domain"])
+        return paginate(fetch_page, PROXY_FIRST_PAGES), 200, None
+    url = spec["url"].format(category=category, pincode=pincode)
+    html, status = _fetch_http(url) if method == "http" else _fetch_playwright(url)
+    leads = parse_listing(html, spec["name"], category) if _parseable(html, status) else []
+    return leads, status, html
+
+def _record_attempt(source, method, outcome, started):
+    get_source_strategy().record(source, method, outcome, time.perf_counter() - started)
+    get_metrics().incr(f"strategy.{source}.{method}.{outcome}")
+
+def _attempt_failed(source, method, e):
+    get_metrics().record_exception(f"{source}.{method}", e)
+    print(f"{SOURCES[source]['name']} {method} error: {e}")
+
+def _keep_empty(source, method, should_fallback):
+    """True if an empty result from `method` is final for `source`."""
+    if not SOURCES[source]["fallback_on_empty"]:
+        return True
+    if should_fallback is not None and not should_fallback():
+        get_metrics().incr(f"strategy.{source}.{method}.fallback_skipped")
+        return True
+    return False
+
+def scrape_source(source, category, pincode, api_key=None, should_fallback=None):
+    """
+    Fetches a directory source with the cheapest method that currently works:
+    methods are tried in order of observed cost per success (static order until measured),
+    methods whose circuit breaker is open (repeated blocks/errors) are skipped,
+    and a blocked or failed attempt falls through to the next method.
+    `should_fallback()` is asked before an empty result falls through (e.g. the query
+    plan already has enough leads for the category from other sources).
+    """
+    strategy = get_source_strategy()
+    for method in strategy.rank(source, _source_methods(source, api_key)):
+        if not strategy.begin(source, method):
+            get_metrics().incr(f"strategy.{source}.{method}.skipped")
+            continue
+        started = time.perf_counter()
+        try:
+            leads, status, html = _fetch_source(source, method, category, pincode, api_key)
+            outcome = classify_fetch(leads, status, html)
+        except Exception as e:
+            _attempt_failed(source, method, e)
+            leads, outcome = [], ERROR
+        except BaseException:
+            # Cancelled (plan stopped, stream closed): not the source's fault, but a
+            # half-open probe must not stay claimed
+            strategy.abandon(source, method)
+            raise
+        _record_attempt(source, method, outcome, started)
+        if outcome == OK or (outcome == EMPTY and _keep_empty(source, method, should_fallback)):
+            return leads
     return []
 
-def scrape_sulekha(category, pincode, api_key=None):
+def scrape_justdial(category, pincode, api_key=None, should_fallback=None):
+    """Scrape Justdial (Google proxy first: Justdial blocks direct loads brutally)."""
+    return scrape_source("justdial", category, pincode, api_key, should_fallback)
+
+def scrape_indiamart(category, pincode, api_key=None, should_fallback=None):
+    """Scrape IndiaMART."""
+    return scrape_source("indiamart", category, pincode, api_key, should_fallback)
+
+def scrape_sulekha(category, pincode, api_key=None, should_fallback=None):
     """Scrape Sulekha."""
-    if api_key:
-        results = google_proxy_search(category, pincode, "sulekha.com", api_key)
-        if results: return results
-
-    url = f"https://www.sulekha.com/search/local?q={category}&location={pincode}"
-    content = fetch_content_playwright(url)
-    if content:
-        return extract_from_html_fuzzy(content, "Sulekha", category)
-    return []
+    return scrape_source("sulekha", category, pincode, api_key, should_fallback)
+
+def _places_page_failed(e):
+    get_metrics().record_exception("places", e)
+    print(f"Places API Error: {e}")
+    return 0, []
 
 def scrape_google_places(category, pincode, api_key):
     """
     Uses Serper Places API (Google Maps) - High Reliability Source.
+    Pages are fetched concurrently for as long as they keep adding new numbers.
     """
     if not api_key: 
         return []
-        
-    results = []
-    url = "https://google.serper.dev/places"
-    # Try 2 pages to get up to 40 results
-    for page in range(1, 3):
-        payload = json.dumps({
-            "q": f"{category} in {pincode}",
-            "location": f"{pincode}, India",
-            "page": page
-        })
-        headers = {
-            'X-API-KEY': api_key,
-            'Content-Type': 'application/json'
-        }
-        
+
+    def fetch_page(page):
         try:
-            response = requests.request("POST", url, headers=headers, data=payload)
-            data = response.json()
-            places = data.get("places", [])
-            
-            if not places:
-                break
-                
-            for place in places:
-                phone = place.get("phoneNumber")
-                
-                # Validation
-                valid_mobile = None
-                if phone:
-                    valid_mobile = is_valid_mobile_string(phone)
-                    
-                if valid_mobile:
-                     results.append({
-                        "Company": place.get("title"),
-                        "Category": category,
-                        "Mobile": valid_mobile,
-                        "Source": "Google Maps",
-                        "Raw_Phone": valid_mobile,
-                        "Website": place.get("website", "N/A")
-                    })
+            places = get_serper_client().places(_places_payload(category, pincode, page), api_key).get("places", [])
         except Exception as e:
-            print(f"Places API Error: {e}")
-            
-    return results
+            return _places_page_failed(e)
+        get_metrics().incr("pages.places")
+        return len(places), _parse_places(places, category)
+
+    return paginate(fetch_page, PLACES_FIRST_PAGES)
+
+class LeadMerger(EntityIndex):
+    """
+    Incremental entity-resolution dedup (phone index + name blocking, see dedup.EntityIndex).
+    add() returns only leads not seen before; duplicates have their Source merged
+    into the lead that was already returned (same dict object).
+    """
+    def normalize_phones(self, phones):
+        # Normalize keys in one batch so differently formatted numbers collapse together
+        return normalize_mobiles(phones)
+
+def dedupe_leads(all_results, scope=None):
+    """Merges duplicate leads (same Mobile or near-identical name), concatenating their Sources."""
+    merger = LeadMerger()
+    merger.add(all_results, scope)
+    return merger.results()
+
+# ==========================================
+# ASYNC ENGINE
+# ==========================================
 
-def multi_source_search(pincode, categories, api_key=None):
+async def _parse_html_async(html, source_name, category):
+    # Parsing is CPU-bound; keep it off the event loop (and large pages off this process)
+    loop = asyncio.get_running_loop()
+    pool = get_parse_pool() if len(html) >= PARSE_POOL_MIN_CHARS else None
+    if pool is not None:
+        try:
+            tuples = await loop.run_in_executor(pool, _extract_lead_tuples, html.encode("utf-8"), source_name, category)
+            return _leads_from_tuples(tuples, source_name, category)
+        except BrokenProcessPool as e:
+            get_metrics().record_exception("parse_pool", e)
+            _reset_parse_pool(pool)
+    return await loop.run_in_executor(None, extract_from_html_fuzzy, html, source_name, category)
+
+async def _fetch_playwright_async(url):
+    async with get_rate_limiter().slot(url) as slot:
+        with get_metrics().timer("fetch.playwright"):
+            content, status = await get_browser_pool(HEADERS['User-Agent']).fetch_async(url, _render_listing)
+        _report_render(slot, status)
+    get_metrics().incr("bytes.pages", len(content or ""))
+    return content, status
+
+async def _fetch_http_async(session, url):
+    async with get_rate_limiter().slot(url) as slot:
+        async with session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT)) as resp:
+            slot.report(resp.status, retry_after=resp.headers.get("Retry-After"))
+            html = await resp.text()
+    get_metrics().incr("bytes.pages", len(html))
+    return html, resp.status
+
+async def fetch_content_playwright_async(url):
+    """Async fetch on the shared browser pool."""
+    try:
+        return (await _fetch_playwright_async(url))[0]
+    except Exception as e:
+        get_metrics().record_exception("playwright", e)
+        print(f"Playwright error: {e}")
+        return None
+
+async def _fetch_source_async(session, source, method, category, pincode, api_key):
+    """Async variant of _fetch_source."""
+    spec = SOURCES[source]
+    if method == "proxy":
+        async def fetch_page(page):
+            payload = _proxy_search_payload(category, pincode, spec["domain"], page)
+            data = await get_serper_client().post_async(session, "search", payload, api_key)
+            get_metrics().incr("pages.search")
+            return len(data.get("organic", [])), _parse_proxy_results(data, category, spec["domain"])
+        return await paginate_async(fetch_page, PROXY_FIRST_PAGES), 200, None
+    url = spec["url"].format(category=category, pincode=pincode)
+    if method == "http":
+        html, status = await _fetch_http_async(session, url)
+    else:
+        html, status = await _fetch_playwright_async(url)
+    leads = await _parse_html_async(html, spec["name"], category) if _parseable(html, status) else []
+    return leads, status, html
+
+async def scrape_source_async(session, source, category, pincode, api_key=None, should_fallback=None):
+    """Async variant of scrape_source."""
+    strategy = get_source_strategy()
+    for method in strategy.rank(source, _source_methods(source, api_key)):
+        if not strategy.begin(source, method):
+            get_metrics().incr(f"strategy.{source}.{method}.skipped")
+            continue
+        started = time.perf_counter()
+        try:
+            leads, status, html = await _fetch_source_async(session, source, method, category, pincode, api_key)
+            outcome = classify_fetch(leads, status, html)
+        except Exception as e:
+            _attempt_failed(source, method, e)
+            leads, outcome = [], ERROR
+        except BaseException:
+            # Cancelled (plan stopped, stream closed): not the source's fault, but a
+            # half-open probe must not stay claimed
+            strategy.abandon(source, method)
+            raise
+        _record_attempt(source, method, outcome, started)
+        if outcome == OK or (outcome == EMPTY and _keep_empty(source, method, should_fallback)):
+            return leads
+    return []
+
+async def scrape_justdial_async(session, category, pincode, api_key=None, should_fallback=None):
+    """Async variant of scrape_justdial."""
+    return await scrape_source_async(session, "justdial", category, pincode, api_key, should_fallback)
+
+async def scrape_indiamart_async(session, category, pincode, api_key=None, should_fallback=None):
+    """Async variant of scrape_indiamart."""
+    return await scrape_source_async(session, "indiamart", category, pincode, api_key, should_fallback)
+
+async def scrape_sulekha_async(session, category, pincode, api_key=None, should_fallback=None):
+    """Async variant of scrape_sulekha."""
+    return await scrape_source_async(session, "sulekha", category, pincode, api_key, should_fallback)
+
+async def scrape_google_places_async(session, category, pincode, api_key):
+    """Async variant of scrape_google_places."""
+    if not api_key:
+        return []
+
+    async def fetch_page(page):
+        try:
+            data = await get_serper_client().post_async(session, "places", _places_payload(category, pincode, page), api_key)
+        except Exception as e:
+            return _places_page_failed(e)
+        places = data.get("places", [])
+        get_metrics().incr("pages.places")
+        return len(places), _parse_places(places, category)
+
+    return await paginate_async(fetch_page, PLACES_FIRST_PAGES)
+
+async def _run_query(session, query, api_key, plan):
+    if query.source == "google_places":
+        return await scrape_google_places_async(session, query.category, query.pincode, api_key)
+    return await scrape_source_async(
+        session, query.source, query.category, query.pincode, api_key,
+        should_fallback=lambda: plan.wants_fallback(query.category)
+    )
+
+async def iter_source_results_async(pincode, categories, api_key=None, concurrency=ASYNC_CONCURRENCY, journal=None, plan=None):
+    """
+    Async generator over raw (not deduplicated) lead lists, one per (source, category)
+    query, in completion order.
+    Queries are taken from `plan` (default: the planner's plan for `pincode`) in priority
+    order, up to `concurrency` in flight, until the plan runs out or stops early.
+    With a `journal`, completed queries are replayed from it and new results recorded.
+    """
+    if plan is None:
+        plan = get_query_planner().plan(pincode, categories)
+    if plan.limited:
+        concurrency = min(concurrency, LIMITED_CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=ASYNC_HTTP_TIMEOUT)
+    # Let page loads use the same concurrency as API calls (unless BROWSER_CONTEXTS pins it)
+    get_browser_pool(HEADERS['User-Agent']).ensure_contexts(concurrency)
+
+    metrics = get_metrics()
+    metrics.incr("planner.queries", len(plan.queries))
+
+    async def run(query):
+        """(query, leads, seconds); seconds is None for results replayed from the journal."""
+        if journal is not None:
+            data = journal.task_result(pincode, query.source, query.category)
+            if data is not None:
+                metrics.incr("journal.tasks_replayed")
+                plan.record(query, data)
+                return query, data, None
+        started = time.perf_counter()
+        with metrics.timer(f"source.{query.source}"):
+            data = await _run_query(session, query, api_key, plan)
+        seconds = time.perf_counter() - started
+        plan.record(query, data, seconds)
+        metrics.incr(f"leads.raw.{query.source}", len(data or []))
+        # Scrapers return [] on errors too, so only non-empty results count as done
+        if journal is not None and data:
+            journal.record_task(pincode, query.source, query.category, data)
+        return query, data, seconds
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        running = set()
+        try:
+            while True:
+                while len(running) < concurrency:
+                    query = plan.next_query()
+                    if query is None:
+                        break
+                    running.add(asyncio.ensure_future(run(query)))
+                if not running:
+                    break
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        query, data, seconds = task.result()
+                    except Exception as e:
+                        metrics.record_exception("source_task", e)
+                        continue
+                    if data:
+                        yield data
+                    # Yield history is bookkeeping: it never holds up or loses results
+                    if seconds is not None:
+                        try:
+                            plan.record_history(query, data, seconds)
+                        except Exception as e:
+                            metrics.record_exception("query_stats", e)
+        finally:
+            for task in running:
+                task.cancel()
+            if plan.stop_reason is not None:
+                metrics.incr(f"planner.stopped.{plan.stop_reason}")
+                metrics.incr("planner.queries_skipped", plan.skipped())
+
+async def iter_multi_source_search_async(pincode, categories, api_key=None, concurrency=ASYNC_CONCURRENCY, journal=None, plan=None, merger=None):
+    """
+    Async generator of deduplicated leads, yielded as soon as their source finishes.
+    Pass a LeadMerger as `merger` to read its final results() (see iter_multi_source_search).
+    """
+    merger = LeadMerger() if merger is None else merger
+    async for data in iter_source_results_async(pincode, categories, api_key, concurrency, journal, plan):
+        for lead in merger.add(data, scope=pincode):
+            yield lead
+
+async def multi_source_search_async(pincode, categories, api_key=None, concurrency=ASYNC_CONCURRENCY, journal=None, plan=None):
+    """
+    Search all sources concurrently on one event loop.
+    `concurrency` caps how many source tasks (API calls and page loads) are in flight.
+    `plan` (query_planner.QueryPlan) picks the queries, their order and when to stop;
+    by default every source is searched for every distinct category.
+    """
+    merger = LeadMerger()
+    async for data in iter_source_results_async(pincode, categories, api_key, concurrency, journal, plan):
+        merger.add(data, scope=pincode)
+    return merger.results()
+
+def _run_sync(coro):
+    """Runs a coroutine to completion, even if the caller already has a running loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+def multi_source_search(pincode, categories, api_key=None, concurrency=ASYNC_CONCURRENCY, journal=None, plan=None):
     """
     Search all sources in parallel: Justdial, IndiaMART, Sulekha, and Google Maps.
+    Blocking wrapper around multi_source_search_async.
     """
-    all_results = []
-    
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = []
-        for cat in categories:
-            # Add JD/IM/Sulekha
-            futures.append(executor.submit(scrape_justdial, cat, pincode, api_key))
-            futures.append(executor.submit(scrape_indiamart, cat, pincode, api_key))
-            futures.append(executor.submit(scrape_sulekha, cat, pincode, api_key))
-            # Add Google Places (New Robust Source)
-            futures.append(executor.submit(scrape_google_places, cat, pincode, api_key))
-            
-        for future in as_completed(futures):
-            try:
-                data = future.result()
-                if data:
-                    all_results.extend(data)
-            except Exception as e:
-                pass
-                
-    # Deduplicate
-    unique_leads = {}
-    for lead in all_results:
-        key = lead['Mobile']
-        if key not in unique_leads:
-            unique_leads[key] = lead
-        else:
-             if lead['Source'] not in unique_leads[key]['Source']:
-                unique_leads[key]['Source'] += f", {lead['Source']}"
-                
-    return list(unique_leads.values())
+    return _run_sync(multi_source_search_async(pincode, categories, api_key, concurrency, journal, plan))
+
+def iter_multi_source_search(pincode, categories, api_key=None, concurrency=ASYNC_CONCURRENCY, journal=None, plan=None, merger=None):
+    """
+    Streaming variant of multi_source_search for synchronous callers.
+    Yields each deduplicated lead as soon as its source finishes. Later duplicates
+    merge their Source into the lead dict that was already yielded.
+    A later lead can also link two leads that were both yielded; the newer one is then
+    folded into the older. Callers that pass their own LeadMerger as `merger` should
+    export merger.results() (or skip merger.is_retracted() leads) once the stream ends.
+    The async engine runs on a background thread; closing the generator cancels it.
+    """
+    results = queue.Queue()
+    finished = object()
+    state = {}
 
+    async def produce():
+        state["task"] = asyncio.current_task()
+        state["loop"] = asyncio.get_running_loop()
+        try:
+            async for data in iter_source_results_async(pincode, categories, api_key, concurrency, journal, plan):
+                results.put(data)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            results.put(e)
+        finally:
+            results.put(finished)
+
+    worker = threading.Thread(target=asyncio.run, args=(produce(),), name="multi-source-search", daemon=True)
+    worker.start()
+
+    merger = LeadMerger() if merger is None else merger
+    try:
+        while True:
+            item = results.get()
+            if item is finished:
+                break
+            if isinstance(item, Exception):
+                raise item
+            for lead in merger.add(item, scope=pincode):
+                yield lead
+    finally:
+        if worker.is_alive() and "loop" in state:
+            state["loop"].call_soon_threadsafe(state["task"].cancel)
+        if merger.retracted:
+            get_metrics().incr("leads.merged_late", len(merger.retracted))
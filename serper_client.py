@@ -0,0 +1,308 @@
+import json
+import os
+import threading
+import time
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from response_cache import ResponseCache
+from rate_limiter import get_rate_limiter
+
+SERPER_BASE_URL = "https://google.serper.dev"
+
+# Client Defaults
+DEFAULT_POOL_SIZE = 32     # Keep-alive connections (>= total scraper + enrichment workers)
+DEFAULT_TIMEOUT = 20       # Seconds per request
+DEFAULT_RETRIES = 3        # Extra attempts on network errors, 429 and 5xx
+DEFAULT_BACKOFF = 0.5      # Seconds; doubled after each failed attempt
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Multi-query batching (Serper accepts a JSON array of queries per POST)
+DEFAULT_BATCH_SIZE = 20        # Max queries per POST; 1 disables batching
+DEFAULT_BATCH_LINGER = 0.05    # Seconds to wait for more queries before sending a partial batch
+DEFAULT_BATCH_SENDERS = 8      # Batches in flight at once
+
+class SerperBatcher:
+    """
+    Coalesces individual Serper queries into multi-query POSTs.
+    - Queries are queued per (endpoint, api_key).
+    - A batch is sent when it reaches `max_batch` queries or its oldest query has waited `linger` seconds.
+    - The array response is split back to each caller's Future, in order.
+    - If the batch POST fails, its queries are resent one by one, so each caller gets
+      its own result or error instead of the batch's.
+    """
+    def __init__(self, client, max_batch=DEFAULT_BATCH_SIZE, linger=DEFAULT_BATCH_LINGER, senders=DEFAULT_BATCH_SENDERS):
+        self.client = client
+        self.max_batch = max_batch
+        self.linger = linger
+        self._queues = {}
+        self._cond = threading.Condition()
+        self._senders = ThreadPoolExecutor(max_workers=senders, thread_name_prefix="serper-batch")
+        self._thread = threading.Thread(target=self._loop, name="serper-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, endpoint, payload, api_key=None):
+        """Queues one query. Returns a concurrent.futures.Future with its decoded response."""
+        future = Future()
+        with self._cond:
+            queue = self._queues.setdefault((endpoint, api_key), [])
+            queue.append((payload, future, time.monotonic()))
+            if len(queue) == 1 or len(queue) >= self.max_batch:
+                self._cond.notify()
+        return future
+
+    def _loop(self):
+        while True:
+            ready = []
+            with self._cond:
+                while not ready:
+                    now = time.monotonic()
+                    wait = None
+                    for key, queue in self._queues.items():
+                        if not queue:
+                            continue
+                        age = now - queue[0][2]
+                        if len(queue) >= self.max_batch or age >= self.linger:
+                            ready.append((key, queue[:self.max_batch]))
+                            del queue[:self.max_batch]
+                        else:
+                            remaining = self.linger - age
+                            wait = remaining if wait is None else min(wait, remaining)
+                    if not ready:
+                        self._cond.wait(wait)
+            for key, batch in ready:
+                self._senders.submit(self._flush, key, batch)
+
+    def _flush(self, key, batch):
+        endpoint, api_key = key
+        if len(batch) > 1:
+            try:
+                results = self.client._send(endpoint, [p for p, _, _ in batch], api_key)
+                if not isinstance(results, list) or len(results) != len(batch):
+                    raise ValueError(f"Serper batch returned {type(results).__name__} for {len(batch)} queries")
+            except Exception as e:
+                print(f"Serper batch of {len(batch)} failed ({e}); resending one by one")
+            else:
+                for (_, f, _), result in zip(batch, results):
+                    f.set_result(result)
+                return
+        for payload, f, _ in batch:
+            try:
+                f.set_result(self.client._send(endpoint, payload, api_key))
+            except Exception as e:
+                f.set_exception(e)
+
+class SerperClient:
+    """
+    Shared Serper client with a pooled keep-alive session.
+    - One TCP+TLS connection pool for every search/places call.
+    - Per-call timeout, retry with exponential backoff on network errors, 429 and 5xx.
+    - Every attempt goes through the shared per-host RateLimiter (429 Retry-After pauses the host).
+    - Counts calls, retries, errors, bytes and latency (see stats()).
+    - Optional ResponseCache: successful responses are served from disk until their TTL expires.
+      `cache_bypass` (or bypass_cache=True per call) skips cache reads but still stores fresh responses.
+    - With batch_size > 1, concurrent queries are coalesced into multi-query POSTs (see SerperBatcher).
+    """
+    def __init__(self, api_key=None, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, base_url=SERPER_BASE_URL,
+                 cache=None, cache_bypass=False, batch_size=1, batch_linger=DEFAULT_BATCH_LINGER):
+        self.api_key = api_key
+        self.cache = cache
+        self.cache_bypass = cache_bypass
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.base_url = base_url
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._stats = {}
+
+        self.batcher = None
+        if batch_size > 1:
+            self.batcher = SerperBatcher(self, max_batch=batch_size, linger=batch_linger)
+
+    def _headers(self, api_key):
+        return {
+            'X-API-KEY': api_key or self.api_key,
+            'Content-Type': 'application/json'
+        }
+
+    def _record(self, endpoint, latency, sent, received, retried=False, failed=False, queries=1):
+        with self._lock:
+            s = self._stats.setdefault(endpoint, {
+                "calls": 0, "queries": 0, "retries": 0, "errors": 0,
+                "bytes_sent": 0, "bytes_received": 0,
+                "latency_total": 0.0, "latency_max": 0.0,
+            })
+            s["calls"] += 1
+            s["queries"] += queries
+            s["bytes_sent"] += sent
+            s["bytes_received"] += received
+            s["latency_total"] += latency
+            s["latency_max"] = max(s["latency_max"], latency)
+            if retried:
+                s["retries"] += 1
+            if failed:
+                s["errors"] += 1
+
+    def _sleep_for(self, attempt):
+        return self.backoff * (2 ** attempt)
+
+    def _cached(self, endpoint, payload, bypass_cache):
+        if self.cache is None or bypass_cache or self.cache_bypass:
+            return None
+        return self.cache.get(endpoint, payload)
+
+    def _store(self, endpoint, payload, result):
+        if self.cache is not None:
+            self.cache.set(endpoint, payload, result)
+
+    def post(self, endpoint, payload, api_key=None, bypass_cache=False):
+        """POSTs `payload` to /<endpoint> and returns the decoded JSON."""
+        cached = self._cached(endpoint, payload, bypass_cache)
+        if cached is not None:
+            return cached
+
+        if self.batcher is not None:
+            result = self.batcher.submit(endpoint, payload, api_key).result(timeout=self._batch_wait())
+        else:
+            result = self._send(endpoint, payload, api_key)
+        self._store(endpoint, payload, result)
+        return result
+
+    def _batch_wait(self):
+        """Seconds a caller waits for its batched query before giving up."""
+        return self.timeout + self.batcher.linger
+
+    def _send(self, endpoint, payload, api_key=None):
+        """One HTTP POST (with retries). `payload` may be a list of queries."""
+        url = f"{self.base_url}/{endpoint}"
+        data = json.dumps(payload)
+        queries = len(payload) if isinstance(payload, list) else 1
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                with get_rate_limiter().slot(url) as slot:
+                    response = self.session.post(url, headers=self._headers(api_key), data=data, timeout=self.timeout)
+                    slot.report(response.status_code, retry_after=response.headers.get("Retry-After"))
+            except (requests.ConnectionError, requests.Timeout):
+                retry = attempt < self.retries
+                self._record(endpoint, time.perf_counter() - start, len(data), 0, retried=retry, failed=not retry, queries=queries)
+                if not retry:
+                    raise
+            else:
+                retry = response.status_code in RETRY_STATUSES and attempt < self.retries
+                failed = response.status_code >= 400 and not retry
+                self._record(endpoint, time.perf_counter() - start, len(data), len(response.content), retried=retry, failed=failed, queries=queries)
+                if not retry:
+                    response.raise_for_status()
+                    return response.json()
+            time.sleep(self._sleep_for(attempt))
+            attempt += 1
+
+    def search(self, payload, api_key=None, bypass_cache=False):
+        return self.post("search", payload, api_key, bypass_cache)
+
+    def places(self, payload, api_key=None, bypass_cache=False):
+        return self.post("places", payload, api_key, bypass_cache)
+
+    async def post_async(self, session, endpoint, payload, api_key=None, bypass_cache=False):
+        """Async variant of post() over a caller-owned aiohttp session."""
+        cached = self._cached(endpoint, payload, bypass_cache)
+        if cached is not None:
+            return cached
+
+        if self.batcher is not None:
+            future = asyncio.wrap_future(self.batcher.submit(endpoint, payload, api_key))
+            result = await asyncio.wait_for(future, self._batch_wait())
+            self._store(endpoint, payload, result)
+            return result
+
+        url = f"{self.base_url}/{endpoint}"
+        data = json.dumps(payload)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                async with get_rate_limiter().slot(url) as slot:
+                    async with session.post(url, headers=self._headers(api_key), data=data, timeout=timeout) as response:
+                        body = await response.read()
+                        status = response.status
+                    slot.report(status, retry_after=response.headers.get("Retry-After"))
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                retry = attempt < self.retries
+                self._record(endpoint, time.perf_counter() - start, len(data), 0, retried=retry, failed=not retry)
+                if not retry:
+                    raise
+            else:
+                retry = status in RETRY_STATUSES and attempt < self.retries
+                failed = status >= 400 and not retry
+                self._record(endpoint, time.perf_counter() - start, len(data), len(body), retried=retry, failed=failed)
+                if not retry:
+                    if status >= 400:
+                        raise requests.HTTPError(f"{status} Error for url: {url}")
+                    result = json.loads(body)
+                    self._store(endpoint, payload, result)
+                    return result
+            await asyncio.sleep(self._sleep_for(attempt))
+            attempt += 1
+
+    def stats(self):
+        """Per-endpoint counters plus average latency, as a plain dict."""
+        with self._lock:
+            out = {}
+            for endpoint, s in self._stats.items():
+                row = dict(s)
+                row["latency_avg"] = s["latency_total"] / s["calls"] if s["calls"] else 0.0
+                out[endpoint] = row
+            return out
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_serper_client():
+    """
+    Returns the process-wide SerperClient, creating it on first use.
+    SERPER_CACHE=0 disables the on-disk response cache; SERPER_CACHE_BYPASS=1 forces fresh calls.
+    SERPER_BATCH_SIZE / SERPER_BATCH_LINGER_MS tune multi-query batching (SERPER_BATCH_SIZE=1 disables it).
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            cache = None
+            if os.environ.get("SERPER_CACHE", "1") != "0":
+                cache = ResponseCache()
+            _client = SerperClient(
+                cache=cache,
+                cache_bypass=os.environ.get("SERPER_CACHE_BYPASS") == "1",
+                batch_size=int(os.environ.get("SERPER_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+                batch_linger=_batch_linger(),
+            )
+        return _client
+
+def _batch_linger():
+    """SERPER_BATCH_LINGER_MS in seconds (fractions allowed); the default if unset or invalid."""
+    value = os.environ.get("SERPER_BATCH_LINGER_MS")
+    if not value:
+        return DEFAULT_BATCH_LINGER
+    try:
+        return max(float(value), 0.0) / 1000
+    except ValueError:
+        print(f"Ignoring invalid SERPER_BATCH_LINGER_MS={value!r}")
+        return DEFAULT_BATCH_LINGER
@@ -0,0 +1,359 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+import aiohttp
+from lxml import etree, html as lxml_html
+from scrapers import HEADERS, find_phone_candidates, normalize_mobiles
+from rate_limiter import get_rate_limiter
+from metrics import get_metrics
+from sqlite_store import SQLiteStore, cache_path
+
+DEFAULT_CACHE_PATH = cache_path("site_pages.sqlite3")
+
+# Crawl limits
+CRAWL_CONCURRENCY = 64        # Sites crawled at once (each site's pages share the host's rate limit)
+MAX_PAGES_PER_SITE = 4        # Homepage plus up to 3 contact/about pages
+MAX_DEPTH = 1                 # Link hops from the homepage
+MAX_PAGE_BYTES = 512 * 1024   # Larger bodies are cut off here
+MAX_ROBOTS_BYTES = 64 * 1024
+PAGE_TIMEOUT = 10             # Seconds per request
+SITE_TIMEOUT = 30             # Seconds per site, so one slow host can't hold up a batch
+MAX_REDIRECTS = 5
+MAX_CONTACTS = 5              # Phones / emails kept per site
+
+# Links worth following from the homepage
+CONTACT_LINK_PATTERN = re.compile(
+    r"contact|about|reach[-_ ]?us|enquir|inquir|get[-_ ]in[-_ ]touch|locat|branch|office",
+    re.IGNORECASE
+)
+# Bounded parts: unbounded runs would backtrack quadratically over long word-character runs
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9-]{1,63}(?:\.[A-Za-z0-9-]{1,63}){0,4}\.[A-Za-z]{2,24}\b")
+NOT_EMAIL_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg', '.css', '.js')
+# Websites that aren't the company's own (directory listings found by the proxy search)
+SKIP_HOSTS = (
+    'justdial.com', 'indiamart.com', 'sulekha.com', 'google.', 'facebook.com', 'instagram.com',
+    'linkedin.com', 'twitter.com', 'x.com', 'youtube.com', 'wikipedia.org', 'zaubacorp.com',
+)
+TEXT_SKIP_TAGS = ('style', 'noscript', 'template')
+
+def site_url(website):
+    """'acme.com/' or 'https://www.acme.com/x' -> 'https://www.acme.com/x'; None for N/A and directories."""
+    if not website or not isinstance(website, str) or website.strip().upper() == "N/A":
+        return None
+    website = website.strip()
+    if "://" not in website:
+        website = "https://" + website
+    parts = urlsplit(website)
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or "." not in host:
+        return None
+    if any(host == h or host.endswith("." + h) or (h.endswith(".") and h in host) for h in SKIP_HOSTS):
+        return None
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path or "/", parts.query, ""))
+
+def _bare_host(host):
+    return host[4:] if host.startswith("www.") else host
+
+def _same_site(host, other):
+    return _bare_host(host) == _bare_host(other)
+
+def _decode(body, content_type):
+    charset = content_type.partition("charset=")[2].split(";")[0].strip().strip('"') or "utf-8"
+    try:
+        return body.decode(charset, "replace")
+    except LookupError:
+        return body.decode("utf-8", "replace")
+
+def extract_contacts(html, base_url):
+    """
+    (phones, emails, links) from one page: validated numbers from the visible text,
+    tel: links and JSON-LD; emails from text and mailto: links; same-site contact/about links.
+    """
+    try:
+        doc = lxml_html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        return [], [], []
+
+    candidates = []
+    emails = []
+    links = []
+    host = urlsplit(base_url).hostname or ""
+    for a in doc.iter('a'):
+        href = (a.get('href') or "").strip()
+        lower = href.lower()
+        if lower.startswith('tel:'):
+            candidates.append(href[4:])
+        elif lower.startswith('mailto:'):
+            emails.append(href[7:].split('?')[0])
+        elif href and not lower.startswith(('javascript:', '#')):
+            if CONTACT_LINK_PATTERN.search(href) or CONTACT_LINK_PATTERN.search(a.text_content() or ""):
+                url = urljoin(base_url, href).split('#')[0]
+                parts = urlsplit(url)
+                if parts.scheme in ("http", "https") and _same_site(parts.hostname or "", host):
+                    links.append(url)
+
+    for el in doc.iter(*TEXT_SKIP_TAGS, 'script'):
+        if el.tag != 'script' or (el.get('type') or "").lower() != 'application/ld+json':
+            el.drop_tree()
+    text = doc.text_content()
+    candidates.extend(find_phone_candidates(text))
+    emails.extend(EMAIL_PATTERN.findall(text))
+
+    phones = [p for p in normalize_mobiles(candidates) if p]
+    emails = [e.lower().strip('.') for e in emails if e and not e.lower().endswith(NOT_EMAIL_SUFFIXES)]
+    return list(dict.fromkeys(phones)), list(dict.fromkeys(emails)), list(dict.fromkeys(links))
+
+class CrawlCache(SQLiteStore):
+    """
+    Validators (ETag / Last-Modified) and extracted contacts per crawled URL, so a recrawl
+    sends conditional GETs and reuses the stored contacts on 304 Not Modified.
+    Thread-safe; a database error reads as uncached (see SQLiteStore).
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS site_pages (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            contacts TEXT NOT NULL,
+            updated REAL NOT NULL
+        );
+    """
+    TABLES = ("site_pages",)
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        super().__init__(path)
+
+    def get(self, url):
+        """(etag, last_modified, (phones, emails, links)) or None."""
+        row = self.fetchone("SELECT etag, last_modified, contacts FROM site_pages WHERE url = ?", (url,))
+        if row is None:
+            return None
+        return row[0], row[1], tuple(json.loads(row[2]))
+
+    def put(self, url, etag, last_modified, contacts):
+        self.execute(
+            "INSERT OR REPLACE INTO site_pages (url, etag, last_modified, contacts, updated) VALUES (?, ?, ?, ?, ?)",
+            (url, etag, last_modified, json.dumps(contacts), time.time())
+        )
+
+class SiteCrawler:
+    """
+    Async contact crawler for company websites.
+    - Per site: robots.txt, the homepage, then same-site contact/about links up to
+      `max_depth` hops and `max_pages` pages.
+    - `concurrency` sites are crawled at once by a fixed set of workers; requests to one
+      host go through its shared RateLimiter slot, and every site has a `site_timeout`
+      deadline, so a slow host only ever ties up its own worker.
+    - Bodies are read up to `max_bytes`; non-HTML responses are skipped.
+    - With a `cache`, pages are fetched with conditional GETs and 304s reuse stored contacts.
+    """
+    def __init__(self, concurrency=CRAWL_CONCURRENCY, max_pages=MAX_PAGES_PER_SITE, max_depth=MAX_DEPTH,
+                 max_bytes=MAX_PAGE_BYTES, page_timeout=PAGE_TIMEOUT, site_timeout=SITE_TIMEOUT,
+                 cache=None, respect_robots=True):
+        self.concurrency = concurrency
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+        self.page_timeout = page_timeout
+        self.site_timeout = site_timeout
+        self.cache = cache
+        self.respect_robots = respect_robots
+        self._parser = ThreadPoolExecutor(max_workers=4, thread_name_prefix="crawl-parse")
+
+    async def _read(self, resp, limit):
+        chunks = []
+        size = 0
+        async for chunk in resp.content.iter_chunked(64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= limit:
+                get_metrics().incr("crawl.truncated")
+                break
+        return b"".join(chunks)[:limit]
+
+    async def _get(self, session, url, headers=None, limit=None):
+        """(status, headers, body bytes or None, final url)."""
+        async with get_rate_limiter().slot(url) as slot:
+            async with session.get(
+                url, headers={**HEADERS, **(headers or {})}, max_redirects=MAX_REDIRECTS,
+                timeout=aiohttp.ClientTimeout(total=self.page_timeout)
+            ) as resp:
+                slot.report(resp.status, retry_after=resp.headers.get("Retry-After"))
+                body = None
+                if resp.status == 200:
+                    body = await self._read(resp, limit or self.max_bytes)
+                    get_metrics().incr("bytes.sites", len(body))
+                return resp.status, resp.headers, body, str(resp.url)
+
+    async def _robots(self, session, url):
+        """RobotFileParser for the site, or None when everything is allowed."""
+        parts = urlsplit(url)
+        robots_url = urlunsplit((parts.scheme, parts.netloc, "/robots.txt", "", ""))
+        try:
+            status, _, body, _ = await self._get(session, robots_url, limit=MAX_ROBOTS_BYTES)
+        except Exception:
+            return None  # Unreachable robots.txt: treated as missing
+        if status != 200 or not body:
+            return None
+        parser = RobotFileParser()
+        parser.parse(body.decode("utf-8", "replace").splitlines())
+        return parser
+
+    async def _page(self, session, url):
+        """(phones, emails, links) for one page, or None if it couldn't be fetched."""
+        metrics = get_metrics()
+        cached = self.cache.get(url) if self.cache is not None else None
+        headers = {}
+        if cached is not None:
+            if cached[0]:
+                headers["If-None-Match"] = cached[0]
+            if cached[1]:
+                headers["If-Modified-Since"] = cached[1]
+        status, resp_headers, body, final_url = await self._get(session, url, headers)
+        metrics.incr("crawl.pages")
+        if status == 304 and cached is not None:
+            metrics.incr("crawl.not_modified")
+            return cached[2]
+        content_type = resp_headers.get("Content-Type", "text/html")
+        if body is None or "html" not in content_type.lower():
+            return None
+        html = _decode(body, content_type)
+        loop = asyncio.get_running_loop()
+        contacts = await loop.run_in_executor(self._parser, extract_contacts, html, final_url)
+        if self.cache is not None and (resp_headers.get("ETag") or resp_headers.get("Last-Modified")):
+            self.cache.put(url, resp_headers.get("ETag"), resp_headers.get("Last-Modified"), contacts)
+        return contacts
+
+    async def _crawl_site(self, session, url):
+        robots = await self._robots(session, url) if self.respect_robots else None
+        user_agent = HEADERS['User-Agent']
+        phones, emails = [], []
+        seen = {url}
+        frontier = [url]
+        pages = 0
+        for depth in range(self.max_depth + 1):
+            allowed = []
+            for page_url in frontier:
+                if robots is not None and not robots.can_fetch(user_agent, page_url):
+                    get_metrics().incr("crawl.robots_blocked")
+                elif pages < self.max_pages:
+                    allowed.append(page_url)
+                    pages += 1
+            results = await asyncio.gather(*(self._page(session, u) for u in allowed), return_exceptions=True)
+            frontier = []
+            for result in results:
+                if isinstance(result, BaseException):
+                    get_metrics().record_exception("crawl", result)
+                    continue
+                if result is None:
+                    continue
+                page_phones, page_emails, links = result
+                phones.extend(page_phones)
+                emails.extend(page_emails)
+                for link in links:
+                    if link not in seen:
+                        seen.add(link)
+                        frontier.append(link)
+            if not frontier or pages >= self.max_pages:
+                break
+        return {
+            "phones": list(dict.fromkeys(phones))[:MAX_CONTACTS],
+            "emails": list(dict.fromkeys(emails))[:MAX_CONTACTS],
+            "pages": pages,
+        }
+
+    async def crawl_async(self, websites):
+        """{website: {'phones', 'emails', 'pages'}} for every crawlable website (others are left out)."""
+        urls = {}
+        for website in websites:
+            url = site_url(website)
+            if url is not None:
+                urls.setdefault(url, []).append(website)
+        results = {}
+        if not urls:
+            return results
+
+        queue = asyncio.Queue()
+        for url in urls:
+            queue.put_nowait(url)
+        metrics = get_metrics()
+
+        async def worker():
+            while True:
+                try:
+                    url = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.perf_counter()
+                try:
+                    contacts = await asyncio.wait_for(self._crawl_site(session, url), self.site_timeout)
+                except Exception as e:
+                    metrics.record_exception("crawl", e)
+                    continue
+                finally:
+                    metrics.observe("crawl.site", time.perf_counter() - started)
+                for website in urls[url]:
+                    results[website] = contacts
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency * 2, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(urls)))))
+        return results
+
+    def crawl(self, websites):
+        """Blocking wrapper around crawl_async (safe to call from inside a running loop)."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.crawl_async(websites))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.crawl_async(websites)).result()
+
+def merge_contacts(lead, contacts):
+    """
+    Adds site phones missing from the lead to 'Alt_Mobiles' and site emails to 'Emails'.
+    Returns True if the lead gained anything.
+    """
+    known = {lead.get('Mobile')} | set(lead.get('Alt_Mobiles', []))
+    new_phones = [p for p in contacts["phones"] if p not in known]
+    new_emails = [e for e in contacts["emails"] if e not in lead.get('Emails', [])]
+    if new_phones:
+        lead.setdefault('Alt_Mobiles', []).extend(new_phones)
+    if new_emails:
+        lead.setdefault('Emails', []).extend(new_emails)
+    return bool(new_phones or new_emails)
+
+def harvest_contacts(leads, crawler=None):
+    """
+    Crawls the Website of every lead and merges the phones and emails found into the
+    leads (in place). Returns how many leads gained contacts.
+    """
+    crawler = crawler or get_site_crawler()
+    found = crawler.crawl([lead.get('Website') for lead in leads])
+    updated = sum(merge_contacts(lead, found[lead['Website']]) for lead in leads if lead.get('Website') in found)
+    get_metrics().incr("crawl.leads_updated", updated)
+    return updated
+
+
+_crawler = None
+_crawler_lock = threading.Lock()
+
+def get_site_crawler():
+    """
+    Returns the process-wide SiteCrawler, creating it on first use.
+    CRAWL_CONCURRENCY overrides the number of sites crawled at once; CRAWL_CACHE=0 turns
+    off conditional GETs.
+    """
+    global _crawler
+    with _crawler_lock:
+        if _crawler is None:
+            cache = CrawlCache() if os.environ.get("CRAWL_CACHE", "1") != "0" else None
+            concurrency = int(os.environ.get("CRAWL_CONCURRENCY", CRAWL_CONCURRENCY))
+            _crawler = SiteCrawler(concurrency=concurrency, cache=cache)
+        return _crawler
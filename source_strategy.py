@@ -0,0 +1,193 @@
+import re
+import threading
+import time
+
+# Fetch outcomes
+OK = "ok"            # Leads found
+EMPTY = "empty"      # Page/response fine, but no leads
+BLOCKED = "blocked"  # Captcha, block page or 403/429
+ERROR = "error"      # Exception, timeout or 5xx
+
+BLOCK_STATUSES = {401, 403, 429}
+BLOCK_PATTERN = re.compile(
+    r"captcha|are you a robot|unusual traffic|access denied|verify you are human|"
+    r"request unsuccessful|attention required|challenge-platform|cf-chl|pardon our interruption|"
+    r"bot detection|temporarily blocked",
+    re.IGNORECASE
+)
+BLOCK_SCAN_CHARS = 20000  # Block pages are small; only the start of a page is checked
+MIN_PAGE_CHARS = 2000     # Shorter loaded pages without leads are treated as block/interstitial pages
+
+# Circuit breaker
+FAILURE_THRESHOLD = 3     # Consecutive blocked/error outcomes that open the breaker
+COOLDOWN = 300.0          # Seconds a tripped method is skipped
+MAX_COOLDOWN = 3600.0     # Cool-down doubles on every failed probe, up to this
+EWMA_ALPHA = 0.2          # Weight of the newest sample in success rate / latency averages
+
+# Method ranking
+RANK_MIN_SAMPLES = 3      # Outcomes needed before a method's observed cost reorders it
+MIN_SUCCESS_RATE = 0.05   # Floor for the expected-cost division (a rarely working method is just very costly)
+
+def detect_block(status, html):
+    """
+    True if an HTTP status or page body looks like a block page rather than a listing.
+    A short page only counts when it loaded (status known): a browser load that timed
+    out may be nothing but about:blank.
+    """
+    if status in BLOCK_STATUSES:
+        return True
+    if html is None:
+        return False
+    if BLOCK_PATTERN.search(html[:BLOCK_SCAN_CHARS]) is not None:
+        return True
+    return status is not None and len(html) < MIN_PAGE_CHARS
+
+def classify_fetch(leads, status=None, html=None):
+    """Outcome of one fetch attempt. Leads always win; a captcha word on a real page is fine."""
+    if leads:
+        return OK
+    if detect_block(status, html):
+        return BLOCKED
+    if status is None and (html is None or len(html) < MIN_PAGE_CHARS):
+        return ERROR  # Nothing (or a blank page) came back: navigation failed or timed out
+    if status is not None and status >= 500:
+        return ERROR
+    return EMPTY
+
+class MethodState:
+    """Success rate, latency and circuit breaker for one (source, method)."""
+    def __init__(self):
+        self.counts = {OK: 0, EMPTY: 0, BLOCKED: 0, ERROR: 0}
+        self.success_rate = None
+        self.latency = None
+        self.failures = 0
+        self.cooldown = COOLDOWN
+        self.open_until = 0.0
+        self.probing = False
+
+    def allows(self, now):
+        """Closed, or open with the cool-down over (one half-open probe at a time)."""
+        if self.open_until == 0.0:
+            return True
+        if now < self.open_until or self.probing:
+            return False
+        self.probing = True
+        return True
+
+    def record(self, outcome, seconds, now):
+        self.counts[outcome] += 1
+        success = 0.0 if outcome in (BLOCKED, ERROR) else 1.0
+        self.success_rate = success if self.success_rate is None else \
+            (1 - EWMA_ALPHA) * self.success_rate + EWMA_ALPHA * success
+        self.latency = seconds if self.latency is None else (1 - EWMA_ALPHA) * self.latency + EWMA_ALPHA * seconds
+
+        if success:
+            self.failures = 0
+            self.open_until = 0.0
+            self.cooldown = COOLDOWN
+        else:
+            self.failures += 1
+            if self.probing:
+                # Failed probe: stay open, for longer
+                self.cooldown = min(MAX_COOLDOWN, self.cooldown * 2)
+                self.open_until = now + self.cooldown
+            elif self.failures >= FAILURE_THRESHOLD:
+                self.open_until = now + self.cooldown
+        self.probing = False
+
+    def expected_cost(self):
+        """Seconds per successful fetch, or None until RANK_MIN_SAMPLES outcomes are in."""
+        if sum(self.counts.values()) < RANK_MIN_SAMPLES:
+            return None
+        return self.latency / max(self.success_rate, MIN_SUCCESS_RATE)
+
+    def abandon(self):
+        """An attempt ended without an outcome (e.g. cancelled): frees the probe slot."""
+        self.probing = False
+
+    def stats(self, now):
+        out = dict(self.counts)
+        out["success_rate"] = round(self.success_rate, 3) if self.success_rate is not None else None
+        out["latency_avg"] = round(self.latency, 3) if self.latency is not None else None
+        cost = self.expected_cost()
+        out["expected_cost"] = round(cost, 3) if cost is not None else None
+        out["state"] = "closed" if self.open_until == 0.0 else ("open" if now < self.open_until else "half-open")
+        out["open_for"] = round(max(0.0, self.open_until - now), 1)
+        return out
+
+class SourceStrategy:
+    """
+    Chooses how to fetch each source.
+    Methods are tried in rank() order, skipping those whose breaker is open (begin()
+    returns False). A method that is blocked or failing FAILURE_THRESHOLD times in a row
+    is skipped for a cool-down, then probed once: success closes the breaker, failure
+    doubles the cool-down.
+    Thread-safe; shared by the sync and async scrapers.
+    """
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def _state(self, source, method):
+        # Caller holds the lock
+        state = self._states.get((source, method))
+        if state is None:
+            state = self._states[(source, method)] = MethodState()
+        return state
+
+    def rank(self, source, methods):
+        """
+        `methods` (listed cheapest first) in the order to try them: closed methods with
+        enough outcomes are sorted among themselves by expected cost (latency / success
+        rate); the others keep their place in the list.
+        """
+        with self._lock:
+            costs = {}
+            for method in methods:
+                state = self._states.get((source, method))
+                if state is not None and state.open_until == 0.0:
+                    cost = state.expected_cost()
+                    if cost is not None:
+                        costs[method] = cost
+        ranked = iter(sorted(costs, key=costs.get))
+        return [next(ranked) if method in costs else method for method in methods]
+
+    def begin(self, source, method):
+        """
+        True if `method` may be tried for `source` now; call record() after trying it,
+        or abandon() if the attempt was cut short.
+        Callers walk their methods cheapest first and use the first that is allowed and works.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return self._state(source, method).allows(now)
+
+    def record(self, source, method, outcome, seconds):
+        with self._lock:
+            self._state(source, method).record(outcome, seconds, time.monotonic())
+
+    def abandon(self, source, method):
+        """Ends an attempt that has no outcome (cancelled, interrupted) without counting it."""
+        with self._lock:
+            self._state(source, method).abandon()
+
+    def reset(self):
+        with self._lock:
+            self._states = {}
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {f"{source}.{method}": state.stats(now) for (source, method), state in sorted(self._states.items())}
+
+
+_strategy = None
+_strategy_lock = threading.Lock()
+
+def get_source_strategy():
+    """Returns the process-wide SourceStrategy, creating it on first use."""
+    global _strategy
+    with _strategy_lock:
+        if _strategy is None:
+            _strategy = SourceStrategy()
+        return _strategy
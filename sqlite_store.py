@@ -0,0 +1,73 @@
+import os
+import sqlite3
+import threading
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+BUSY_TIMEOUT = 30  # Seconds to wait on a write lock held by another thread or worker process
+
+def cache_path(filename):
+    """Path of a store file in the shared .cache directory."""
+    return os.path.join(CACHE_DIR, filename)
+
+class SQLiteStore:
+    """
+    Base for the local SQLite (WAL) stores: response cache, journal, company store,
+    query stats and crawl cache.
+    - One connection shared by every thread, guarded by a lock; safe to share the file
+      between worker processes.
+    - run()/execute()/fetchone()/fetchall() never raise sqlite3 errors (a lock held too
+      long by another process, a read-only or corrupt file): the failure is printed and
+      counted in `errors`, reads return `default` and writes are skipped. A broken store
+      costs repeated work, never results.
+    Subclasses set SCHEMA (CREATE statements) and TABLES (cleared by clear()).
+    """
+    SCHEMA = ""
+    TABLES = ()
+
+    def __init__(self, path):
+        self.path = path
+        self.errors = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+
+    def run(self, fn, default=None):
+        """Calls fn(conn) under the lock and commits; returns `default` on a database error."""
+        with self._lock:
+            try:
+                result = fn(self._conn)
+                self._conn.commit()
+                return result
+            except sqlite3.Error as e:
+                self.errors += 1
+                try:
+                    self._conn.rollback()
+                except sqlite3.Error:
+                    pass
+                print(f"{type(self).__name__} error: {e}")
+                return default
+
+    def execute(self, sql, params=()):
+        """Runs one write statement; returns False if it failed."""
+        return self.run(lambda conn: bool(conn.execute(sql, params)), default=False)
+
+    def fetchone(self, sql, params=(), default=None):
+        return self.run(lambda conn: conn.execute(sql, params).fetchone(), default)
+
+    def fetchall(self, sql, params=(), default=()):
+        return self.run(lambda conn: conn.execute(sql, params).fetchall(), default)
+
+    def clear(self):
+        def clear_tables(conn):
+            for table in self.TABLES:
+                conn.execute(f"DELETE FROM {table}")
+        self.run(clear_tables)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()